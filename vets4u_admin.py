@@ -0,0 +1,143 @@
+"""Maintenance commands for the Vets4u dashboard data.
+
+    python vets4u_admin.py migrate-sqlite vets4u.db
+    python vets4u_admin.py stress-writes --processes 8
+    python vets4u_admin.py status-table verify --path vets4u_status.db
+    python vets4u_admin.py checkins archive --keep-months 2
+
+Run from the directory holding the tracker CSVs.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import vets4u_core as core
+
+def cmd_migrate_sqlite(args):
+    source = core.CsvStorage(dict(core.TRACKER_FILES))
+    target = core.open_storage(f"sqlite:{args.db}")
+    counts = target.import_csv(source)
+    for dataset, n in counts.items():
+        print(f"{dataset:>16}: {n} rows")
+    print(f"Imported into {args.db}. Set VETS4U_STORAGE=sqlite:{args.db} to use it.")
+
+def _stress_worker(folder, worker, threads, checkins, bookings, schedules):
+    storage = core.CsvStorage.in_folder(folder)
+    storage.ensure_templates()
+
+    def check_in(t):
+        for i in range(checkins):
+            storage.append_checkin({'Date': "2030-01-01", 'Name': f"w{worker}t{t}", 'Status': "Present",
+                                    'Note': f"{i}, burst", 'Timestamp': ""})
+    pool = [threading.Thread(target=check_in, args=(t,)) for t in range(threads)]
+    for t in pool: t.start()
+    for i in range(bookings):
+        storage.append_holiday({"Name": f"w{worker}", "Request Date": "2030-01-01", "Absence Start": "2030-02-01",
+                                "Absence End": "2030-02-02", "Type": "Holiday", "Status": "Approved", "Notes": str(i)})
+    store = storage.load_schedule()
+    for i in range(schedules):
+        day = date(2030, 1, 1) + timedelta(days=worker * schedules + i)
+        store.upsert({"Date": day.strftime("%Y-%m-%d"), "Opener": f"w{worker}", "Downstairs": "", "Upstairs": "", "Vet Screening": ""})
+    for t in pool: t.join()
+
+def cmd_stress_writes(args):
+    """Hammers every save path from several processes at once and checks nothing was lost."""
+    with tempfile.TemporaryDirectory() as folder:
+        ctx = multiprocessing.get_context("spawn")
+        started = time.perf_counter()
+        procs = [ctx.Process(target=_stress_worker, args=(folder, w, args.threads, args.checkins, args.bookings, args.schedules))
+                 for w in range(args.processes)]
+        for p in procs: p.start()
+        for p in procs: p.join()
+        elapsed = time.perf_counter() - started
+
+        storage = core.CsvStorage.in_folder(folder)
+        expected = {
+            'checkins': args.processes * args.threads * args.checkins,
+            'holidays': args.processes * args.bookings,
+            'schedule': args.processes * args.schedules,
+        }
+        found = {
+            'checkins': len(storage.read_checkins()),
+            'holidays': len(core.load_holidays(storage.files['holidays'])[0]),
+            'schedule': len(core.ScheduleStore.load(storage.schedule_file)),
+        }
+        failed = [p.exitcode for p in procs if p.exitcode != 0]
+        for dataset in expected:
+            status = "ok" if found[dataset] == expected[dataset] else "LOST ROWS"
+            print(f"{dataset:>10}: {found[dataset]}/{expected[dataset]} {status}")
+        print(f"{sum(expected.values())} writes from {args.processes} processes in {elapsed:.2f}s")
+        if failed or found != expected:
+            print(f"FAILED (worker exit codes: {failed})" if failed else "FAILED")
+            return 1
+        return 0
+
+def cmd_status_table(args):
+    path = args.path or core.STATUS_TABLE
+    if not path:
+        raise SystemExit("No status table: pass --path or set VETS4U_STATUS_TABLE.")
+    app = core.Vets4uDashboard()
+    if app.load_error is not None:
+        raise SystemExit(f"Could not load data: {app.load_error}")
+    app.status_table = core.open_status_table(path)
+    if args.action == "rebuild":
+        print(f"Rebuilt {app.status_table.rebuild(app)} days in {path}")
+        return 0
+    app.status_table.sync(app)
+    start, end = app.status_table.window()
+    stale = app.status_table.verify(app)
+    print(f"{path}: {start} to {end}, {len(stale)} days differ from the raw data")
+    for date_str in stale[:20]:
+        print(f"  {date_str}")
+    return 1 if stale else 0
+
+def cmd_checkins(args):
+    log = core.CsvStorage(dict(core.TRACKER_FILES)).checkin_log()
+    if args.action == "archive":
+        today = date.today()
+        month = today.year * 12 + today.month - 1 - args.keep_months
+        before = f"{month // 12:04d}-{month % 12 + 1:02d}"
+        archived = log.archive(before)
+        print(f"Archived {len(archived)} month(s) before {before}" + (f": {archived[0]} to {archived[-1]}" if archived else ""))
+        return 0
+    for month, files in sorted(log.partitions().items()):
+        sizes = [f"{name} ({os.path.getsize(log.file(name)) // 1024} KB)" for name in files.values() if os.path.exists(log.file(name))]
+        print(f"  {month}: {', '.join(sizes) or '(empty)'}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("migrate-sqlite", help="Import the CSV files into a SQLite database")
+    p.add_argument("db", help="Path of the SQLite database to create or replace")
+    p.set_defaults(func=cmd_migrate_sqlite)
+
+    p = sub.add_parser("stress-writes", help="Check that concurrent saves from many processes lose no rows")
+    p.add_argument("--processes", type=int, default=8)
+    p.add_argument("--threads", type=int, default=4, help="Check-in threads per process")
+    p.add_argument("--checkins", type=int, default=100, help="Check-ins per thread")
+    p.add_argument("--bookings", type=int, default=20, help="Holiday bookings per process")
+    p.add_argument("--schedules", type=int, default=20, help="Schedule saves per process")
+    p.set_defaults(func=cmd_stress_writes)
+
+    p = sub.add_parser("status-table", help="Rebuild or verify the materialized daily status table")
+    p.add_argument("action", choices=["rebuild", "verify"])
+    p.add_argument("--path", help="Status table file (default: VETS4U_STATUS_TABLE)")
+    p.set_defaults(func=cmd_status_table)
+
+    p = sub.add_parser("checkins", help="List the monthly check-in partitions or archive old ones")
+    p.add_argument("action", choices=["list", "archive"])
+    p.add_argument("--keep-months", type=int, default=2, help="Months before the current one to leave live (default 2)")
+    p.set_defaults(func=cmd_checkins)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Attendance analytics over the whole check-in log.
+
+    rollups = attendance_rollups(app.storage)
+    rollups.by_person(), rollups.by_weekday(), rollups.by_month()
+
+Counts are person-days: the latest status per person per date, as analyze_day
+uses it. The log is aggregated once into daily and monthly rollups; after that
+each refresh only folds in the rows appended since the last one, so the views
+never re-aggregate raw history.
+"""
+import threading
+
+import vets4u_core as core
+
+STATUSES = ["Present", "Late", "Sick", "Holiday", "Absent"]
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+def _with_rates(counts):
+    """Adds Days and Lateness/Sick rates to a frame of status counts."""
+    counts = counts.reindex(columns=STATUSES + [c for c in counts.columns if c not in STATUSES], fill_value=0).astype('int64')
+    days = counts.sum(axis=1)
+    attended = counts['Present'] + counts['Late']
+    counts['Days'] = days
+    counts['Lateness %'] = (100 * counts['Late'] / attended.where(attended > 0)).round(1)
+    counts['Sick %'] = (100 * counts['Sick'] / days.where(days > 0)).round(1)
+    return counts
+
+def _add(total, delta):
+    if not len(total):
+        return delta.astype('int64')
+    return total.add(delta, fill_value=0).fillna(0).astype('int64')
+
+class AttendanceRollups:
+    """Daily (Date x Status) and monthly (Month x Name x Status) person-day counts.
+
+    refresh() reads the log from where it last stopped. A later check-in for the
+    same person and date moves that person-day from its old status to the new one.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.cursor = None
+        self.latest = {}
+        self.daily = core.pd.DataFrame(dtype='int64')
+        self.monthly = core.pd.DataFrame(dtype='int64')
+
+    def refresh(self):
+        with self.lock:
+            rows, cursor, reset = self.storage.read_checkins_since(self.cursor)
+            if reset:
+                self._reset()
+            self.cursor = cursor
+            if len(rows):
+                self._apply(rows)
+        return self
+
+    def _apply(self, rows):
+        pd = core.pd
+        rows = rows[rows['Date'].notna() & rows['Name'].notna() & rows['Status'].notna()]
+        batch = rows.drop_duplicates(['Date', 'Name'], keep='last')[['Date', 'Name', 'Status']]
+        keys = list(zip(batch['Date'], batch['Name']))
+        previous = batch.assign(Status=[self.latest.get(k) for k in keys]).dropna(subset=['Status'])
+        self.latest.update(zip(keys, batch['Status']))
+
+        delta = pd.concat([batch.assign(n=1), previous.assign(n=-1)], ignore_index=True)
+        delta['Month'] = delta['Date'].str[:7]
+        daily = delta.groupby(['Date', 'Status'])['n'].sum().unstack(fill_value=0)
+        monthly = delta.groupby(['Month', 'Name', 'Status'])['n'].sum().unstack(fill_value=0)
+        self.daily = _add(self.daily, daily)
+        self.monthly = _add(self.monthly, monthly)
+        core.PERF.count('attendance rows folded', len(rows))
+
+    def months(self):
+        return sorted(self.monthly.index.get_level_values('Month').unique()) if len(self.monthly) else []
+
+    def _monthly_since(self, since_month):
+        if since_month is None or not len(self.monthly):
+            return self.monthly
+        return self.monthly[self.monthly.index.get_level_values('Month') >= since_month]
+
+    def by_person(self, since_month=None):
+        """Status counts, lateness and sick rates per person, most sick days first."""
+        monthly = self._monthly_since(since_month)
+        if not len(monthly):
+            return _with_rates(core.pd.DataFrame(columns=STATUSES))
+        return _with_rates(monthly.groupby(level='Name').sum()).sort_values(['Sick', 'Late'], ascending=False)
+
+    def by_month(self, since_month=None):
+        """Status counts and rates per month, with the month-over-month change in each rate."""
+        monthly = self._monthly_since(since_month)
+        if not len(monthly):
+            return _with_rates(core.pd.DataFrame(columns=STATUSES))
+        trend = _with_rates(monthly.groupby(level='Month').sum())
+        trend['Lateness Δ'] = trend['Lateness %'].diff().round(1)
+        trend['Sick Δ'] = trend['Sick %'].diff().round(1)
+        return trend
+
+    def by_weekday(self, since_month=None):
+        """Status counts and rates per day of the week."""
+        daily = self.daily
+        if since_month is not None and len(daily):
+            daily = daily[daily.index >= since_month]
+        if not len(daily):
+            return _with_rates(core.pd.DataFrame(columns=STATUSES))
+        weekday = core.pd.to_datetime(daily.index, format='%Y-%m-%d', errors='coerce').day_name().rename('Day')
+        return _with_rates(daily.groupby(weekday).sum()).reindex([d for d in WEEKDAYS if d in set(weekday)])
+
+_rollups = {}
+_rollups_lock = threading.Lock()
+
+def attendance_rollups(storage):
+    """The process-wide rollups for a data set, brought up to date with its log."""
+    with _rollups_lock:
+        if storage.key not in _rollups:
+            _rollups[storage.key] = AttendanceRollups(storage)
+        rollups = _rollups[storage.key]
+    return rollups.refresh()
@@ -0,0 +1,216 @@
+"""Read-only JSON status API for wall displays and phones.
+
+    VETS4U_API_TOKEN=s3cret python vets4u_api.py --port 8502
+    curl -H "Authorization: Bearer s3cret" http://localhost:8502/api/today
+    curl "http://localhost:8502/api/forecast?days=14&token=s3cret"
+
+Run from the directory holding the tracker CSVs (or pass --data-dir). With
+branches configured, add ?branch=<name>. Responses are computed once per data
+change and served from memory with an ETag, so pollers that send If-None-Match
+get an empty 304 until something on disk changes.
+
+Responses name who is off sick, so the server listens on 127.0.0.1 unless
+--host says otherwise, and every /api request needs the token (a random one is
+generated and printed when VETS4U_API_TOKEN and --token are both unset).
+Browser pages on another origin need --cors-origin.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sys
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import vets4u_core as core
+from vets4u_branches import Branch, load_branches
+
+MAX_FORECAST_DAYS = 91
+MAX_HEADER_BYTES = 16 * 1024
+IDLE_TIMEOUT = 30
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 405: "Method Not Allowed"}
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class StatusService:
+    """Builds and caches the JSON bodies for one or more data folders.
+
+    A cached body is reused while its data set's fingerprint (file signatures,
+    or SQLite version counters) and the date are unchanged; concurrent requests
+    for a stale body share a single recomputation.
+    """
+
+    def __init__(self, data_dir=None, branches=None):
+        self.sites = {None: Branch(None, data_dir)}
+        for branch in branches or []:
+            self.sites[branch.name] = branch
+        self.storages = {}
+        self.cache = {}
+        self.pending = {}
+        self.builds = 0
+
+    def _storage(self, site):
+        if site not in self.storages:
+            # As Branch.open() builds it, so a branch's own storage spec (e.g. sqlite:) is honoured
+            branch = self.sites[site]
+            self.storages[site] = core.open_storage(branch.storage, folder=branch.data_dir, files=dict(core.TRACKER_FILES))
+        return self.storages[site]
+
+    def _build(self, site, kind, days):
+        storage = self._storage(site)
+        app = core.Vets4uDashboard(storage=storage, data_dir=self.sites[site].data_dir)
+        if app.load_error is not None:
+            raise app.load_error
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        if kind == "today":
+            payload = {"date": today.strftime("%Y-%m-%d"), **app.analyze_day(today)}
+        else:
+            forecast = app.get_weekly_forecast(today, days)
+            payload = {"start": today.strftime("%Y-%m-%d"), "days": forecast.to_dict('records')}
+        payload["branch"] = site
+        # The ETag covers the data only, so a rebuild that changes nothing still gets 304s
+        etag = '"%s"' % hashlib.sha1(json.dumps(payload, default=_json_default).encode("utf-8")).hexdigest()[:20]
+        payload["generated"] = datetime.now().isoformat(timespec='seconds')
+        self.builds += 1
+        return json.dumps(payload, default=_json_default).encode("utf-8"), etag
+
+    async def get(self, site, kind, days=0):
+        """(body, etag) for a request, rebuilding it only if the data or date moved on."""
+        key = (site, kind, days)
+        version = (datetime.now().date(), json.dumps(self._storage(site).fingerprint()))
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        # Only requests that saw the same data version share a build, so a build started
+        # before a change is never cached under the version after it
+        building = (key, version)
+        task = self.pending.get(building)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(self._build, site, kind, days))
+            self.pending[building] = task
+            task.add_done_callback(lambda _: self.pending.pop(building, None))
+        body, etag = await task
+        self.cache[key] = (version, body, etag)
+        return body, etag
+
+class ApiServer:
+    def __init__(self, service, token, cors_origin=None):
+        self.service = service
+        self.token = token
+        self.cors_origin = cors_origin
+        self.requests = 0
+        self.not_modified = 0
+
+    async def route(self, method, target, headers):
+        """(status, body, etag) for one request."""
+        if method == "OPTIONS" and self.cors_origin:
+            return 204, b"", None
+        if method not in ("GET", "HEAD"):
+            return 405, b'{"error": "GET only"}', None
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        if url.path != "/health" and not self._authorized(headers, query):
+            return 401, b'{"error": "Missing or wrong token"}', None
+        site = query.get("branch", [None])[0]
+        if site not in self.service.sites:
+            return 404, json.dumps({"error": f"Unknown branch: {site}"}).encode("utf-8"), None
+        if url.path == "/health":
+            return 200, b'{"ok": true}', None
+        if url.path == "/api/today":
+            body, etag = await self.service.get(site, "today")
+        elif url.path == "/api/forecast":
+            try:
+                days = int(query.get("days", ["5"])[0])
+            except ValueError:
+                return 400, b'{"error": "days must be a number"}', None
+            body, etag = await self.service.get(site, "forecast", max(1, min(days, MAX_FORECAST_DAYS)))
+        else:
+            return 404, b'{"error": "Not found"}', None
+        if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            self.not_modified += 1
+            return 304, b"", etag
+        return 200, body, etag
+
+    def _authorized(self, headers, query):
+        scheme, _, sent = headers.get("authorization", "").partition(" ")
+        sent = sent.strip() if scheme.lower() == "bearer" else query.get("token", [""])[0]
+        return hmac.compare_digest(sent.encode("utf-8"), self.token.encode("utf-8"))
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    writer.write(self._response(400, b'{"error": "Bad request"}', None, False))
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name: headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+
+                self.requests += 1
+                try:
+                    status, body, etag = await self.route(method, target, headers)
+                except Exception as e:
+                    status, body, etag = 500, json.dumps({"error": str(e)}).encode("utf-8"), None
+                writer.write(self._response(status, b"" if method == "HEAD" else body, etag, keep_alive, len(body)))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    def _response(self, status, body, etag, keep_alive, length=None):
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Internal Server Error')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body) if length is None else length}",
+                "Cache-Control: no-cache",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if etag: head.append(f"ETag: {etag}")
+        if status == 401: head.append('WWW-Authenticate: Bearer realm="vets4u"')
+        if self.cors_origin:
+            head += [f"Access-Control-Allow-Origin: {self.cors_origin}",
+                     "Access-Control-Allow-Headers: Authorization, If-None-Match",
+                     "Access-Control-Expose-Headers: ETag"]
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+async def serve(host, port, service, token, cors_origin=None):
+    api = ApiServer(service, token, cors_origin)
+    server = await asyncio.start_server(api.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Vets4u status API on http://{host}:{port}/api/today")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: this machine only)")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--data-dir", help="Folder holding the tracker CSVs (default: current directory)")
+    parser.add_argument("--token", default=os.environ.get("VETS4U_API_TOKEN", ""),
+                        help="Token clients send as 'Authorization: Bearer <token>' or ?token= (default: VETS4U_API_TOKEN)")
+    parser.add_argument("--cors-origin", help="Origin allowed to call the API from a browser, e.g. https://display.example")
+    args = parser.parse_args(argv)
+    token = args.token
+    if not token:
+        token = secrets.token_urlsafe(18)
+        print(f"No VETS4U_API_TOKEN set; clients must send this token: {token}")
+    try:
+        asyncio.run(serve(args.host, args.port, StatusService(args.data_dir, load_branches()), token, args.cors_origin))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
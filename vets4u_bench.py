@@ -0,0 +1,253 @@
+"""Synthetic data generator and benchmark suite for the Vets4u dashboard.
+
+    python vets4u_bench.py generate ./demo --staff 30 --years 3
+    python vets4u_bench.py run --sizes small,medium,large --out bench.json
+    python vets4u_bench.py run --compare bench.json
+
+Generated files use the same formats ensure_data_loaded reads, including the
+title rows above the headers of exported tracker sheets.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import vets4u_branches
+import vets4u_core as core
+import vets4u_reports
+import vets4u_risk
+import vets4u_rota
+
+SIZES = {
+    'small': {'staff': 8, 'years': 1},
+    'medium': {'staff': 30, 'years': 3},
+    'large': {'staff': 80, 'years': 8},
+}
+FIRST_NAMES = ["Asha", "Ben", "Chloe", "Dev", "Ella", "Farah", "George", "Hana", "Isaac", "Jas",
+               "Kiran", "Leah", "Mo", "Nina", "Omar", "Priya", "Quinn", "Ravi", "Sara", "Tom"]
+
+def staff_names(n):
+    names = []
+    for i in range(n):
+        base = FIRST_NAMES[i % len(FIRST_NAMES)]
+        names.append(base if i < len(FIRST_NAMES) else f"{base} {i // len(FIRST_NAMES) + 1}")
+    return names
+
+def _write_with_title(df, path, title):
+    """Writes a CSV with the title/blank rows a Google Sheets export puts above the header."""
+    width = len(df.columns)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        f.write(title + "," * (width - 1) + "\n")
+        f.write("," * (width - 1) + "\n")
+        df.to_csv(f, index=False)
+
+def generate(folder, staff=30, years=3, end=None, seed=0):
+    """Writes a full synthetic data set into folder. Returns row counts per file."""
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    storage = core.CsvStorage.in_folder(folder)
+    names = staff_names(staff)
+    end = end or date.today() + timedelta(days=90)
+    start = end - timedelta(days=int(365 * years))
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    weekdays = [d for d in days if d.weekday() < 5]
+
+    skills = pd.DataFrame([{
+        "Name": n,
+        "Opening": "YES" if i % 3 == 0 else "NO",
+        "Dispensing": "YES" if rng.random() < 0.8 else "NO",
+        "Second Check": "YES" if rng.random() < 0.6 else "NO",
+        "Vet Screening": "YES" if rng.random() < 0.2 else "NO",
+    } for i, n in enumerate(names)])
+    _write_with_title(skills, storage.files['skills'], "Skills Matrix")
+
+    bookings = []
+    for n in names:
+        for _ in range(int(years * 4)):
+            first = rng.choice(days)
+            length = rng.choice([0, 0, 1, 2, 4, 6, 13])
+            bookings.append({
+                "Name": n,
+                "Request Date": (first - timedelta(days=rng.randint(7, 60))).strftime("%Y-%m-%d"),
+                "Absence Start": first.strftime("%Y-%m-%d"),
+                "Absence End": (first + timedelta(days=length)).strftime("%Y-%m-%d"),
+                "Type": rng.choice(["Holiday", "Holiday", "Training", "Sick (Planned)"]),
+                "Status": rng.choice(["Approved"] * 8 + ["Pending", "Rejected"]),
+                "Notes": "",
+            })
+    holidays = pd.DataFrame(bookings).sort_values("Request Date")
+    _write_with_title(holidays, storage.files['holidays'], "Holiday Tracker")
+
+    per_day = max(3, staff // 4)
+    grid = [[""] * 20 for _ in range(4)]
+    grid[0][0] = "Vets4u 4-Week Schedule"
+    for week in range(4):
+        grid.append([f"WEEK {week + 1} - CONFIRMED"] + [""] * 19)
+        grid.append([""] + ["Mon", "Tue", "Wed", "Thu", "Fri"] + [""] * 14)
+        for role in core.LEGACY_ROLES:
+            grid.append([role] + [" + ".join(rng.sample(names, 2)) for _ in range(5)] + [""] * 14)
+        grid.append([""] * 20)
+    pd.DataFrame(grid).to_csv(storage.files['schedule'], index=False, header=False)
+
+    schedule = []
+    for d in weekdays[-min(len(weekdays), 120):]:
+        crew = rng.sample(names, min(per_day + 1, len(names)))
+        schedule.append({"Date": d.strftime("%Y-%m-%d"), "Opener": crew[0], "Downstairs": ", ".join(crew[1:3]),
+                         "Upstairs": ", ".join(crew[3:]), "Vet Screening": rng.choice(["Sue", "The Vets"] + names[:2])})
+    pd.DataFrame(schedule, columns=core.SCHEDULE_COLUMNS).to_csv(storage.schedule_file, index=False)
+
+    checkins = []
+    for d in weekdays:
+        if d > date.today(): break
+        for n in rng.sample(names, min(per_day, len(names))):
+            status = rng.choices(["Present", "Late", "Sick", "Holiday", "Absent"], [85, 7, 4, 3, 1])[0]
+            stamp = datetime.combine(d, datetime.min.time()) + timedelta(hours=8, minutes=rng.randint(0, 90))
+            checkins.append({"Date": d.strftime("%Y-%m-%d"), "Name": n, "Status": status,
+                             "Note": "" if status == "Present" else rng.choice(["", "traffic", "called in"]),
+                             "Timestamp": stamp.strftime("%Y-%m-%d %H:%M:%S")})
+    pd.DataFrame(checkins, columns=core.CHECKIN_COLUMNS).to_csv(storage.status_file, index=False)
+
+    return {'skills': len(skills), 'holidays': len(holidays), 'legacy_schedule': len(grid),
+            'simple_schedule': len(schedule), 'checkins': len(checkins)}
+
+def _timed(fn, repeat):
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t) * 1000)
+    return {'median_ms': round(statistics.median(runs), 3), 'min_ms': round(min(runs), 3), 'runs': repeat}
+
+def bench_size(label, staff, years, repeat=5):
+    """Generates one data set in a temp folder and times the dashboard against it."""
+    with tempfile.TemporaryDirectory() as folder:
+        rows = generate(folder, staff=staff, years=years)
+        storage = core.CsvStorage.in_folder(folder)
+        today = datetime.combine(date.today(), datetime.min.time())
+        names = staff_names(staff)
+
+        def cold_load():
+            core.DATA_CACHE.invalidate()
+            core._status_readers.clear()
+            core.Vets4uDashboard(storage=storage)
+
+        def cold_parse():
+            core.SNAPSHOTS = False
+            try:
+                cold_load()
+            finally:
+                core.SNAPSHOTS = snapshots
+
+        snapshots = core.SNAPSHOTS
+        timings = {
+            'ensure_data_loaded (cold)': _timed(cold_load, repeat),
+            'ensure_data_loaded (parse)': _timed(cold_parse, repeat),
+            'ensure_data_loaded (warm)': _timed(lambda: core.Vets4uDashboard(storage=storage), repeat),
+        }
+        app = core.Vets4uDashboard(storage=storage)
+        days = iter([today - timedelta(days=i) for i in range(repeat * 3)])
+        timings['analyze_day'] = _timed(lambda: app.analyze_day(next(days)), repeat)
+        timings['get_weekly_forecast'] = _timed(lambda: app.get_weekly_forecast(today), repeat)
+        timings['get_forecast (91 days)'] = _timed(lambda: app.get_forecast(today, 91), repeat)
+        timings['analyze_range (365 days)'] = _timed(lambda: app.analyze_range(today, today + timedelta(days=364)), repeat)
+        timings['generate_rota (4 weeks)'] = _timed(
+            lambda: vets4u_rota.generate_rota(app, today, today + timedelta(days=27), overwrite=True), repeat)
+        timings['simulate_risk (90 days)'] = _timed(lambda: vets4u_risk.simulate_risk(app, today, 90, 10000), repeat)
+        with tempfile.TemporaryDirectory() as out_dir:
+            timings['export_reports (1 year)'] = _timed(
+                lambda: vets4u_reports.export_reports([vets4u_branches.Branch(label, folder)], today - timedelta(days=364), today,
+                                                      "weekly", list(vets4u_reports.FORMATS), out_dir), repeat)
+
+        counter = iter(range(10 ** 6))
+        timings['save_checkin'] = _timed(lambda: app.save_checkin(today, names[next(counter) % staff], "Present", ""), repeat)
+        timings['save_holiday'] = _timed(lambda: app.save_holiday(names[0], today, today + timedelta(days=2), "Holiday", ""), repeat)
+        timings['save_simple_schedule'] = _timed(
+            lambda: app.save_simple_schedule(today + timedelta(days=next(counter) % 30), names[:1], names[1:3], names[3:4], []), repeat)
+        timings['save_skills'] = _timed(lambda: app.save_skills(app.data['skills']), repeat)
+
+        return {'size': label, 'staff': staff, 'years': years, 'rows': rows, 'timings': timings}
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(sizes, repeat=5):
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'results': [bench_size(label, repeat=repeat, **SIZES[label]) for label in sizes],
+    }
+
+def print_report(report, baseline=None):
+    base = {}
+    for result in (baseline or {}).get('results', []):
+        for op, t in result['timings'].items():
+            base[(result['size'], op)] = t['median_ms']
+    for result in report['results']:
+        print(f"\n{result['size']} ({result['staff']} staff, {result['years']} years, {result['rows']['checkins']} check-ins)")
+        for op, t in result['timings'].items():
+            line = f"  {op:<28} {t['median_ms']:>10.2f} ms"
+            old = base.get((result['size'], op))
+            if old:
+                line += f"   x{t['median_ms'] / old:.2f} vs {baseline.get('commit') or 'baseline'}"
+            print(line)
+
+def cmd_generate(args):
+    counts = generate(args.folder, staff=args.staff, years=args.years, seed=args.seed)
+    for name, n in counts.items():
+        print(f"{name:>16}: {n} rows")
+
+def cmd_run(args):
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise SystemExit(f"Unknown size(s): {', '.join(unknown)} (choose from {', '.join(SIZES)})")
+    report = run(sizes, repeat=args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("generate", help="Write a synthetic data set")
+    p.add_argument("folder")
+    p.add_argument("--staff", type=int, default=30)
+    p.add_argument("--years", type=float, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("run", help="Time the dashboard at several data sizes")
+    p.add_argument("--sizes", default="small,medium", help=f"Comma-separated, from {', '.join(SIZES)}")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--out", help="Write results as JSON")
+    p.add_argument("--compare", help="Earlier JSON results to compare against")
+    p.set_defaults(func=cmd_run)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
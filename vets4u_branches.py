@@ -0,0 +1,105 @@
+"""Multi-branch mode: one data folder per pharmacy and a rollup across them.
+
+Branches are listed in vets4u_branches.json (or the file named by
+VETS4U_BRANCHES_FILE):
+
+    {"branches": [
+        {"name": "Leicester", "data_dir": "/srv/vets4u/leicester"},
+        {"name": "Loughborough", "data_dir": "/srv/vets4u/loughborough", "storage": "sqlite:vets4u.db"}
+    ]}
+
+A relative data_dir is resolved against the config file's folder.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import vets4u_core as core
+
+BRANCHES_FILE = os.environ.get("VETS4U_BRANCHES_FILE", "vets4u_branches.json")
+# "thread" or "process"; see rollup()
+ROLLUP_EXECUTOR = os.environ.get("VETS4U_ROLLUP_EXECUTOR", "thread")
+ROLLUP_COLUMNS = ["Branch", "Status", "Staff", "Openers", "Checkers", "Vet Screen", "Alerts", "Load ms"]
+
+class Branch:
+    def __init__(self, name, data_dir, storage=None):
+        self.name = name
+        self.data_dir = data_dir
+        self.storage = storage
+
+    def __repr__(self):
+        return f"Branch({self.name!r}, {self.data_dir!r})"
+
+    def open(self):
+        """A dashboard over this branch's data (parsed files come from DATA_CACHE)."""
+        storage = core.open_storage(self.storage, folder=self.data_dir) if self.storage else None
+        return core.Vets4uDashboard(storage=storage, data_dir=self.data_dir)
+
+def load_branches(path=None):
+    """Branches from the config file, or [] when the file doesn't exist."""
+    path = path or BRANCHES_FILE
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    return [Branch(b["name"], os.path.join(base, b["data_dir"]), b.get("storage")) for b in config.get("branches", [])]
+
+def branch_summary(branch, date_obj):
+    """The rollup row for one branch: its analyze_day status on date_obj."""
+    started = time.perf_counter()
+    try:
+        app = branch.open()
+        if app.load_error is not None:
+            raise app.load_error
+        result = app.analyze_day(date_obj)
+    except Exception as e:
+        return {"Branch": branch.name, "Status": "ERROR", "Staff": 0, "Openers": 0, "Checkers": 0,
+                "Vet Screen": False, "Alerts": str(e), "Load ms": round((time.perf_counter() - started) * 1000, 1)}
+    return {
+        "Branch": branch.name,
+        "Status": result.get('overall_status', 'CLOSED'),
+        "Staff": result.get('count', 0),
+        "Openers": result.get('openers', 0),
+        "Checkers": result.get('checkers', 0),
+        "Vet Screen": result.get('vet_screen', False),
+        "Alerts": " | ".join(result.get('alerts', [])) or result.get('msg', ''),
+        "Load ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+def _summary_in_worker(name, data_dir, storage, date_str):
+    return branch_summary(Branch(name, data_dir, storage), datetime.strptime(date_str, "%Y-%m-%d"))
+
+_process_pool = None
+
+def _get_process_pool(max_workers):
+    # Kept for the life of the server so each worker's DATA_CACHE stays warm between reruns
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _process_pool
+
+def rollup(branches, date_obj, executor=None, max_workers=None):
+    """analyze_day for every branch at once, loaded in parallel. Returns rows in branch order.
+
+    executor="thread" shares this process's caches, so warm reruns cost a few stat
+    calls per branch. executor="process" spreads cold parsing over every core, using
+    a long-lived pool whose workers keep their own caches warm.
+    """
+    executor = executor or ROLLUP_EXECUTOR
+    if not branches:
+        return core.pd.DataFrame(columns=ROLLUP_COLUMNS)
+    max_workers = max_workers or min(32, len(branches), (os.cpu_count() or 1) * 4)
+    if executor == "process":
+        pool = _get_process_pool(max_workers)
+        date_str = date_obj.strftime("%Y-%m-%d")
+        futures = [pool.submit(_summary_in_worker, b.name, b.data_dir, b.storage, date_str) for b in branches]
+        rows = [f.result() for f in futures]
+    elif executor == "thread":
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(lambda b: branch_summary(b, date_obj), branches))
+    else:
+        raise ValueError(f"Unknown executor: {executor}")
+    return core.pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
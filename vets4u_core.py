@@ -0,0 +1,2225 @@
+"""Scheduling and analysis engine for the Vets4u dashboard.
+
+Importable without Streamlit, for scripts and cron jobs:
+
+    from vets4u_core import Vets4uDashboard
+    app = Vets4uDashboard()
+    print(app.analyze_day(datetime.now()))
+
+pandas and numpy are only imported the first time something needs them.
+"""
+from datetime import datetime, timedelta
+import importlib
+import os
+import re
+import time
+import csv
+import io
+import threading
+import functools
+import json
+import contextlib
+import tempfile
+import sqlite3
+import hashlib
+import gzip
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class _LazyModule:
+    """Stands in for a heavy module until first use, then replaces itself in globals()."""
+
+    def __init__(self, alias, name):
+        self._alias = alias
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+pd = _LazyModule('pd', 'pandas')
+np = _LazyModule('np', 'numpy')
+
+# Files
+STATUS_FILE = "vets4u_daily_status.csv"
+SIMPLE_SCHEDULE_FILE = "vets4u_simple_schedule.csv"
+TRACKER_FILES = {
+    'schedule': "vets4u Tracker.xlsx - 4-Week Schedule.csv",
+    'skills': "vets4u Tracker.xlsx - Skills Matrix.csv",
+    'staff': "vets4u Tracker.xlsx - Staff Directory.csv",
+    'holidays': "vets4u Tracker.xlsx - Holiday Tracker.csv"
+}
+# "csv" (default) or "sqlite:<path to .db>"
+STORAGE = os.environ.get("VETS4U_STORAGE", "csv")
+# Path of an opt-in SQLite file holding one materialized analyze_day result per date (see StatusTable)
+STATUS_TABLE = os.environ.get("VETS4U_STATUS_TABLE", "")
+# Columnar snapshots of large parsed files, kept in .vets4u_snapshots beside them (see Snapshot)
+SNAPSHOTS = os.environ.get("VETS4U_SNAPSHOTS", "1") != "0"
+# YYYY-MM-DD of a Monday to count week 1 of an undated legacy 4-week sheet from. Unset, an
+# undated sheet always shows its first week, as it always has (see LegacyRoster)
+LEGACY_ROTATION_START = os.environ.get("VETS4U_LEGACY_ROTATION_START", "")
+
+class PerfRecorder:
+    """Switchable timers and counters for the hot paths.
+
+    Streamlit runs each session's script in its own thread, so records are kept
+    per thread and reset at the start of each rerun. When disabled, timer() hands
+    back a shared no-op context and count() returns straight away.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.local = threading.local()
+
+    def _records(self):
+        records = getattr(self.local, 'records', None)
+        if records is None:
+            records = self.local.records = {'started': time.time(), 'timers': {}, 'counters': {}}
+        return records
+
+    def reset(self):
+        self.local.records = None
+
+    @contextlib.contextmanager
+    def _timing(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            t = self._records()['timers'].setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            t['calls'] += 1
+            t['total_ms'] += elapsed
+            t['max_ms'] = max(t['max_ms'], elapsed)
+
+    def timer(self, name):
+        return self._timing(name) if self.enabled else _NO_TIMER
+
+    def count(self, name, n=1):
+        if not self.enabled: return
+        counters = self._records()['counters']
+        counters[name] = counters.get(name, 0) + n
+
+    def snapshot(self):
+        """This thread's timings and counters since the last reset()."""
+        records = self._records()
+        return {
+            'started': datetime.fromtimestamp(records['started']).isoformat(timespec='seconds'),
+            'timers': {k: {'calls': v['calls'], 'total_ms': round(v['total_ms'], 3), 'max_ms': round(v['max_ms'], 3)}
+                       for k, v in records['timers'].items()},
+            'counters': dict(records['counters']),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+_NO_TIMER = contextlib.nullcontext()
+PERF = PerfRecorder(enabled=os.environ.get("VETS4U_PERF") == "1")
+
+def timed(name):
+    """Decorator timing a function under PERF when instrumentation is on."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not PERF.enabled:
+                return fn(*args, **kwargs)
+            with PERF._timing(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+SNAPSHOT_DIR = ".vets4u_snapshots"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MIN_BYTES = 64 * 1024
+
+def _hash_prefix(path, size):
+    """SHA-1 of the first size bytes of a file, or None if it's shorter than that."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        remaining = size
+        while remaining > 0:
+            chunk = f.read(min(1 << 20, remaining))
+            if not chunk: return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+def _text_arrays(values):
+    """(fixed-width unicode array, null mask) for a column of strings with gaps."""
+    values = list(values)
+    mask = np.array([v is None or (isinstance(v, float) and v != v) for v in values], dtype=bool)
+    return np.array(['' if m else str(v) for v, m in zip(values, mask)], dtype=str), mask
+
+def _text_values(text, mask):
+    return [float('nan') if m else v for v, m in zip(text.tolist(), mask.tolist())]
+
+def frame_to_arrays(df):
+    """Splits a DataFrame into numpy arrays for a Snapshot. Returns (arrays, column specs)."""
+    arrays, columns = {}, []
+    for i, name in enumerate(df.columns):
+        col = df.iloc[:, i]
+        if col.dtype.kind in 'biuf':
+            arrays[f'col{i}'] = col.to_numpy()
+            columns.append({'name': name, 'text': False})
+        else:
+            arrays[f'col{i}'], arrays[f'null{i}'] = _text_arrays(col)
+            columns.append({'name': name, 'text': True, 'dtype': str(col.dtype)})
+    return arrays, columns
+
+def frame_from_arrays(arrays, columns):
+    data = {}
+    for i, spec in enumerate(columns):
+        if spec['text']:
+            col = pd.Series(arrays[f'col{i}'], dtype=spec['dtype'] if spec['dtype'] == 'str' else object)
+            data[i] = col.mask(arrays[f'null{i}']) if arrays[f'null{i}'].any() else col
+        else:
+            data[i] = pd.Series(np.array(arrays[f'col{i}']))
+    df = pd.DataFrame(data, index=pd.RangeIndex(len(arrays['col0']) if columns else 0))
+    df.columns = [spec['name'] for spec in columns]
+    return df
+
+class Snapshot:
+    """Columnar copy of a parsed file: one .npy per array plus a JSON manifest.
+
+    Kept in .vets4u_snapshots beside the source and keyed by the source's
+    mtime/size and SHA-1, so a touched or copied file still matches. Arrays are
+    memory-mapped on load. Writes are best effort; any problem just means the
+    next start parses the CSV again.
+    """
+
+    def __init__(self, source, name):
+        self.source = source
+        self.folder = os.path.join(os.path.dirname(os.path.abspath(source)), SNAPSHOT_DIR)
+        self.stem = f"{os.path.basename(source)}.{name}"
+        self.manifest = os.path.join(self.folder, self.stem + ".json")
+
+    @classmethod
+    def for_source(cls, source, name):
+        """A Snapshot for source, or None when snapshots are off or the file is too small to bother."""
+        sig = file_signature(source)
+        if not SNAPSHOTS or sig is None or sig[1] < SNAPSHOT_MIN_BYTES:
+            return None
+        return cls(source, name)
+
+    def read(self, prefix=False):
+        """(arrays, manifest) if the snapshot still matches the source, else None.
+
+        With prefix=True the source may have grown since (an append-only log);
+        only the bytes the snapshot covers have to match.
+        """
+        try:
+            with open(self.manifest, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        sig = file_signature(self.source)
+        if sig is None or meta.get('version') != SNAPSHOT_VERSION:
+            return None
+        if list(sig) != meta['signature']:
+            if sig[1] < meta['size'] or (not prefix and sig[1] != meta['size']):
+                return None
+            if _hash_prefix(self.source, meta['size']) != meta['sha1']:
+                return None
+        try:
+            arrays = {k: np.load(os.path.join(self.folder, f), mmap_mode='r', allow_pickle=False) for k, f in meta['arrays'].items()}
+        except (OSError, ValueError):
+            return None
+        PERF.count(f'snapshot hits: {self.stem}')
+        return arrays, meta
+
+    def write(self, arrays, size=None, **extra):
+        """Saves arrays as the snapshot of the source's first size bytes (default: all of it)."""
+        try:
+            sig = file_signature(self.source)
+            size = sig[1] if size is None else size
+            digest = _hash_prefix(self.source, size)
+            os.makedirs(self.folder, exist_ok=True)
+            generation = f"{time.time_ns():x}"
+            files = {}
+            for i, (key, arr) in enumerate(arrays.items()):
+                files[key] = f"{self.stem}.{generation}.{i}.npy"
+                np.save(os.path.join(self.folder, files[key]), np.asarray(arr), allow_pickle=False)
+            meta = {'version': SNAPSHOT_VERSION, 'signature': list(sig), 'size': size, 'sha1': digest, 'arrays': files, **extra}
+            fd, tmp = tempfile.mkstemp(prefix="." + self.stem, suffix=".tmp", dir=self.folder)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self.manifest)
+            for name in os.listdir(self.folder):
+                if name.startswith(self.stem + ".") and name.endswith(".npy") and name not in files.values():
+                    with contextlib.suppress(OSError): os.unlink(os.path.join(self.folder, name))
+            PERF.count(f'snapshot writes: {self.stem}')
+        except (OSError, TypeError, ValueError):
+            PERF.count('snapshot write errors')
+
+def _to_ns(value):
+    """Parses a date-like value to epoch nanoseconds, or None if it can't be compared."""
+    try:
+        ts = pd.to_datetime(value)
+    except Exception:
+        return None
+    if ts is None or pd.isna(ts) or getattr(ts, 'tz', None) is not None:
+        return None
+    return ts.value
+
+SKILL_OPENING = 1
+SKILL_DISPENSING = 2
+SKILL_SECOND_CHECK = 4
+SKILL_VET_SCREENING = 8
+SKILL_COLUMNS = {'Opening': SKILL_OPENING, 'Dispensing': SKILL_DISPENSING,
+                 'Second Check': SKILL_SECOND_CHECK, 'Vet Screening': SKILL_VET_SCREENING}
+
+def normalize_name(name):
+    return str(name).strip().lower()
+
+class SkillsIndex:
+    """Skills Matrix compiled to {normalized name: capability bitmask}.
+
+    Built once when the matrix is loaded or saved; the first row for a name wins,
+    and a skill counts only when its cell reads YES.
+    """
+
+    def __init__(self, df=None):
+        self.caps = {}
+        if df is None:
+            return
+        columns = [(c, bit) for c, bit in SKILL_COLUMNS.items() if c in df.columns]
+        for label, row in zip(df.index, df[[c for c, _ in columns]].itertuples(index=False, name=None)):
+            if not isinstance(label, str): continue
+            key = normalize_name(label)
+            if key in self.caps: continue
+            mask = 0
+            for (_, bit), value in zip(columns, row):
+                if str(value).upper() == 'YES': mask |= bit
+            self.caps[key] = mask
+
+    def __len__(self):
+        return len(self.caps)
+
+    def get(self, name):
+        return self.caps.get(normalize_name(name), 0)
+
+    def has(self, name, skill):
+        return bool(self.get(name) & skill)
+
+# Bookings longer than this are checked on their own rather than widening every lookup's window
+LONG_BOOKING_NS = 92 * 86400 * 10 ** 9
+
+class AbsenceIndex:
+    """Approved absences from the Holiday Tracker, parsed once and sorted by start.
+
+    Lookups bisect on the start column and only scan the window of bookings that
+    could still overlap the query (bounded by the longest booking up to
+    LONG_BOOKING_NS), so they stay logarithmic in the size of the tracker. The
+    few longer bookings (or typos such as an end date in 2205) are kept in a
+    separate position list and checked directly. Results keep tracker row order
+    so a later row for the same person wins, as it always has.
+    """
+
+    def __init__(self, df=None):
+        self.starts = np.empty(0, dtype='int64')
+        self.ends = np.empty(0, dtype='int64')
+        self.rows = np.empty(0, dtype='int64')
+        self.names = []
+        self.types = []
+        self.max_span = 0
+        self.long = np.empty(0, dtype='int64')
+        self.next_row = 0
+        if df is not None:
+            self.rebuild(df)
+
+    def __len__(self):
+        return len(self.names)
+
+    def rebuild(self, df):
+        self.__init__()
+        self.next_row = len(df)
+        required = ['Name', 'Absence Start', 'Absence End', 'Type', 'Status']
+        if any(c not in df.columns for c in required):
+            return self
+
+        parsed = {}
+        def parse(v, iso):
+            if iso is not None: return iso
+            key = v if isinstance(v, str) else repr(v)
+            if key not in parsed: parsed[key] = _to_ns(v)
+            return parsed[key]
+
+        # Plain YYYY-MM-DD cells parse in one vectorized pass; anything else falls back to _to_ns
+        def iso_ns(col):
+            ts = pd.to_datetime(df[col], format='%Y-%m-%d', errors='coerce')
+            return [None if pd.isna(t) else t.value for t in ts]
+
+        entries = []
+        cols = zip(df['Name'], df['Absence Start'], df['Absence End'], df['Type'], df['Status'],
+                   iso_ns('Absence Start'), iso_ns('Absence End'))
+        for pos, (name, start, end, typ, status, iso_start, iso_end) in enumerate(cols):
+            if str(status) != 'Approved': continue
+            s, e = parse(start, iso_start), parse(end, iso_end)
+            if s is None or e is None or e < s: continue
+            entries.append((s, pos, e, name, typ))
+
+        entries.sort(key=lambda x: (x[0], x[1]))
+        if entries:
+            self.starts = np.array([x[0] for x in entries], dtype='int64')
+            self.rows = np.array([x[1] for x in entries], dtype='int64')
+            self.ends = np.array([x[2] for x in entries], dtype='int64')
+            self.names = [x[3] for x in entries]
+            self.types = [x[4] for x in entries]
+            self._index_spans()
+        return self
+
+    def _index_spans(self):
+        spans = self.ends - self.starts
+        is_long = spans > LONG_BOOKING_NS
+        self.long = np.nonzero(is_long)[0]
+        self.max_span = int(spans[~is_long].max()) if len(spans) > len(self.long) else 0
+
+    def to_arrays(self):
+        """The index as numpy arrays plus scalars, for a Snapshot."""
+        names, names_null = _text_arrays(self.names)
+        types, types_null = _text_arrays(self.types)
+        arrays = {'starts': self.starts, 'ends': self.ends, 'rows': self.rows, 'names': names,
+                  'names_null': names_null, 'types': types, 'types_null': types_null}
+        return arrays, {'next_row': int(self.next_row)}
+
+    @classmethod
+    def from_arrays(cls, arrays, scalars):
+        index = cls()
+        index.starts = np.array(arrays['starts'])
+        index.ends = np.array(arrays['ends'])
+        index.rows = np.array(arrays['rows'])
+        index.names = _text_values(arrays['names'], arrays['names_null'])
+        index.types = _text_values(arrays['types'], arrays['types_null'])
+        index._index_spans()
+        index.next_row = scalars['next_row']
+        return index
+
+    def with_booking(self, name, start, end, type, status="Approved"):
+        """A new index with one booking added, as if it were appended to the tracker.
+
+        Indexes are shared between sessions through DATA_CACHE, so this never
+        changes self; a lookup running in another thread keeps a consistent copy.
+        """
+        index = AbsenceIndex()
+        index.starts, index.ends, index.rows = self.starts, self.ends, self.rows
+        index.names, index.types = self.names, self.types
+        index.max_span, index.long = self.max_span, self.long
+        index.next_row = self.next_row + 1
+        s, e = _to_ns(start), _to_ns(end)
+        if str(status) != 'Approved' or s is None or e is None or e < s:
+            return index
+        i = int(np.searchsorted(self.starts, s, side='right'))
+        index.starts = np.insert(self.starts, i, s)
+        index.ends = np.insert(self.ends, i, e)
+        index.rows = np.insert(self.rows, i, self.next_row)
+        index.names = self.names[:i] + [name] + self.names[i:]
+        index.types = self.types[:i] + [type] + self.types[i:]
+        index._index_spans()
+        return index
+
+    def _overlapping(self, lo_ns, hi_ns):
+        """Positions of bookings overlapping [lo_ns, hi_ns], in tracker row order."""
+        left = int(np.searchsorted(self.starts, lo_ns - self.max_span, side='left'))
+        right = int(np.searchsorted(self.starts, hi_ns, side='right'))
+        hits = left + np.nonzero(self.ends[left:right] >= lo_ns)[0]
+        if len(self.long):
+            long = self.long[(self.starts[self.long] <= hi_ns) & (self.ends[self.long] >= lo_ns)]
+            hits = np.union1d(hits, long)
+        return hits[np.argsort(self.rows[hits], kind='stable')]
+
+    def absent_on(self, date_obj):
+        """Returns {name: type} for everyone on approved leave on the given date."""
+        day = pd.Timestamp(date_obj.strftime("%Y-%m-%d")).value
+        return {self.names[i]: self.types[i] for i in self._overlapping(day, day)}
+
+    def absent_between(self, start_date, end_date):
+        """Returns (name, type, start, end) for every approved booking overlapping the range."""
+        lo = pd.Timestamp(start_date.strftime("%Y-%m-%d")).value
+        hi = pd.Timestamp(end_date.strftime("%Y-%m-%d")).value
+        return [(self.names[i], self.types[i], pd.Timestamp(self.starts[i]), pd.Timestamp(self.ends[i]))
+                for i in self._overlapping(lo, hi)]
+
+class StatusLogReader:
+    """Tails the daily status log, parsing only lines appended since the last read.
+
+    The log is append-only (see save_checkin), so the reader keeps its byte offset
+    and the file's mtime/size and keeps a per-date {name: latest status} map in
+    memory. If the file is replaced or shrinks it starts again from the top.
+
+    Rows covered by a Snapshot are kept as date-sorted arrays (the base) and
+    looked up by bisection; only rows after the snapshot go into the map. A
+    fresh reader starts from the snapshot and tails the rest of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.mtime = None
+        self.size = None
+        self.inode = None
+        self.header = None
+        self.rows_read = 0
+        self.by_date = {}
+        self.base = None
+        self.base_offset = 0
+
+    def refresh(self):
+        """Reads any newly appended lines. Returns True if anything changed."""
+        with self.lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                changed = self.header is not None
+                self._reset()
+                return changed
+            if (stat.st_mtime_ns, stat.st_size, stat.st_ino) == (self.mtime, self.size, self.inode):
+                return False
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._reset()
+
+            catching_up = self.offset == 0
+            snapshot = Snapshot.for_source(self.path, 'statuses') if catching_up else None
+            if snapshot:
+                self._load_snapshot(snapshot)
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                chunk = f.read(stat.st_size - self.offset)
+            end = chunk.rfind(b'\n') + 1
+            if end:
+                self._parse(chunk[:end].decode('utf-8-sig' if self.offset == 0 else 'utf-8'))
+                self.offset += end
+            self.mtime, self.size, self.inode = stat.st_mtime_ns, stat.st_size, stat.st_ino
+            if snapshot and self.offset - self.base_offset >= SNAPSHOT_MIN_BYTES:
+                self._save_snapshot(snapshot)
+            return True
+
+    def _load_snapshot(self, snapshot):
+        cached = snapshot.read(prefix=True)
+        if not cached:
+            return
+        arrays, meta = cached
+        self.base = (arrays['dates'], arrays['names'], arrays['statuses'])
+        self.base_offset = self.offset = meta['size']
+        self.header = meta['header']
+        self.rows_read = meta['rows']
+
+    def _save_snapshot(self, snapshot):
+        """Snapshots everything read so far, then serves it from the new base."""
+        dates, names, statuses = [], [], []
+        for d in sorted(set(self.by_date) | set(self._base_dates())):
+            for name, status in self._merged(d).items():
+                dates.append(d); names.append(name); statuses.append(status)
+        base = (np.array(dates, dtype=str), np.array(names, dtype=str), np.array(statuses, dtype=str))
+        snapshot.write({'dates': base[0], 'names': base[1], 'statuses': base[2]}, size=self.offset,
+                       header=self.header, rows=self.rows_read)
+        self.base, self.base_offset, self.by_date = base, self.offset, {}
+
+    def _base_dates(self):
+        return [] if self.base is None else np.unique(self.base[0]).tolist()
+
+    def _merged(self, date_str):
+        """{name: latest status} for a date from the base and the rows since, or None."""
+        result = None
+        if self.base is not None:
+            dates, names, statuses = self.base
+            lo, hi = np.searchsorted(dates, date_str, 'left'), np.searchsorted(dates, date_str, 'right')
+            if hi > lo:
+                result = dict(zip(names[lo:hi].tolist(), statuses[lo:hi].tolist()))
+        tail = self.by_date.get(date_str)
+        if tail:
+            if result is None: result = {}
+            result.update(tail)
+        return result
+
+    def _parse(self, text):
+        reader = csv.reader(io.StringIO(text))
+        if self.header is None:
+            for row in reader:
+                if row:
+                    self.header = {c.strip(): i for i, c in enumerate(row)}
+                    break
+        try:
+            d_i, n_i, s_i = self.header['Date'], self.header['Name'], self.header['Status']
+        except (KeyError, TypeError):
+            return
+        width = max(d_i, n_i, s_i)
+        rows = 0
+        for row in reader:
+            if len(row) <= width or not row[n_i]: continue
+            self.by_date.setdefault(row[d_i], {})[row[n_i]] = row[s_i]
+            self.rows_read += 1
+            rows += 1
+        PERF.count('rows read: status log', rows)
+        PERF.count('bytes parsed: status log', len(text))
+
+    def statuses_on(self, date_str):
+        """Returns {name: latest status} for one day, in first check-in order."""
+        self.refresh()
+        return self._merged(date_str) or {}
+
+    def statuses_for(self, date_strs):
+        """{date: {name: latest status}} for several days at once."""
+        self.refresh()
+        result = {}
+        for d in date_strs:
+            statuses = self._merged(d)
+            if statuses is not None: result[d] = statuses
+        return result
+
+_status_readers = {}
+_status_readers_lock = threading.Lock()
+
+def status_log_reader(path=STATUS_FILE):
+    """Returns the process-wide reader for a status log, so reruns share its offset."""
+    key = os.path.abspath(path)
+    with _status_readers_lock:
+        if key not in _status_readers:
+            _status_readers[key] = StatusLogReader(path)
+        return _status_readers[key]
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on a data file, shared by every thread and process using it.
+
+    The lock is taken on a sidecar "<path>.lock" file so the data file itself can
+    be atomically replaced while it is held.
+    """
+    with open(path + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def atomic_write_csv(df, path, **kwargs):
+    """Writes df to a temp file next to path, fsyncs it and renames it into place."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            df.to_csv(f, **kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.unlink(tmp)
+        raise
+
+class AppendQueue:
+    """Group-commit queue for rows appended to a CSV log.
+
+    Each append() blocks until its row is on disk. Whichever caller finds no flush
+    in progress writes everything queued so far in one locked append, so a burst
+    of check-ins costs one lock and one write instead of one each.
+    """
+
+    def __init__(self, path, columns, lock_path=None):
+        self.path = path
+        self.columns = columns
+        self.lock_path = lock_path or path
+        self.cond = threading.Condition()
+        self.pending = []
+        self.queued = 0
+        self.written = 0
+        self.flushes = 0
+        self.flushing = False
+        self.failures = []
+
+    def append(self, row):
+        with self.cond:
+            self.pending.append(row)
+            self.queued += 1
+            ticket = self.queued
+            while self.written < ticket:
+                if self.flushing:
+                    self.cond.wait()
+                    continue
+                batch, self.pending = self.pending, []
+                first = self.written + 1
+                self.flushing = True
+                self.cond.release()
+                error = None
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    error = e
+                finally:
+                    self.cond.acquire()
+                    self.flushing = False
+                    self.written += len(batch)
+                    self.flushes += 1
+                    if error is not None:
+                        self.failures = self.failures[-7:] + [(first, self.written, error)]
+                    self.cond.notify_all()
+            for first, last, error in self.failures:
+                if first <= ticket <= last:
+                    raise error
+
+    def _write(self, batch):
+        with file_lock(self.lock_path):
+            new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            with open(self.path, "a", newline="", encoding="utf-8") as f:
+                pd.DataFrame(batch, columns=self.columns).to_csv(f, header=new_file, index=False)
+                f.flush()
+                os.fsync(f.fileno())
+
+_append_queues = {}
+
+def append_queue(path, columns=None, lock_path=None):
+    """Returns the process-wide append queue for a CSV log (locked through lock_path if given)."""
+    key = os.path.abspath(path)
+    with _status_readers_lock:
+        if key not in _append_queues:
+            _append_queues[key] = AppendQueue(path, columns or CHECKIN_COLUMNS, lock_path)
+        return _append_queues[key]
+
+def file_signature(path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+class DataCache:
+    """Process-wide cache of parsed datasets keyed by file path, mtime and size.
+
+    Streamlit reruns and concurrent sessions build a fresh Vets4uDashboard each
+    time; they all share one parsed copy per file and only re-parse when the file
+    changes on disk or a save_* method invalidates it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, loader):
+        key = os.path.abspath(path)
+        sig = file_signature(path)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == sig:
+                self.hits += 1
+                PERF.count('cache hits')
+                return entry[1]
+            self.misses += 1
+        PERF.count('cache misses')
+        if sig is not None:
+            PERF.count(f'bytes parsed: {os.path.basename(path)}', sig[1])
+        value = loader(path)
+        with self.lock:
+            self.entries[key] = (sig, value)
+        return value
+
+    def put(self, path, value):
+        """Stores a value that already reflects the file as it is now on disk."""
+        with self.lock:
+            self.entries[os.path.abspath(path)] = (file_signature(path), value)
+
+    def invalidate(self, path=None):
+        with self.lock:
+            if path is None: self.entries.clear()
+            else: self.entries.pop(os.path.abspath(path), None)
+
+DATA_CACHE = DataCache()
+
+def tail_csv(path, cursor=None):
+    """Rows appended to a CSV log since cursor. Returns (rows, cursor, reset).
+
+    The cursor is (inode, offset, header bytes); reset is True when rows is the
+    whole file because there was no cursor or the file was replaced or truncated.
+    """
+    empty = pd.DataFrame(columns=CHECKIN_COLUMNS)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return empty, None, cursor is not None
+    inode, offset, header = cursor or (None, 0, None)
+    reset = cursor is None or stat.st_ino != inode or stat.st_size < offset
+    if reset:
+        offset, header = 0, None
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        chunk = f.read(stat.st_size - offset)
+    chunk = chunk[:chunk.rfind(b'\n') + 1]
+    if header is None:
+        header, chunk = chunk[:chunk.find(b'\n') + 1], chunk[chunk.find(b'\n') + 1:]
+        offset += len(header)
+        if not header:
+            return empty, (stat.st_ino, 0, None), reset
+    rows = pd.read_csv(io.BytesIO(header + chunk), dtype=str) if chunk else empty
+    PERF.count('rows read: status log (since)', len(rows))
+    return rows, (stat.st_ino, offset + len(chunk), header), reset
+
+def partition_of(date_str):
+    """The month partition ("YYYY-MM") a check-in date belongs to, or "other" for malformed dates."""
+    date_str = str(date_str or "")
+    return date_str[:7] if re.match(r"\d{4}-\d{2}", date_str) else "other"
+
+def load_status_archive(path):
+    """{date: {name: latest status}} from an archived (gzipped) month of check-ins."""
+    by_date = {}
+    with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('Name'):
+                by_date.setdefault(row.get('Date'), {})[row['Name']] = row.get('Status')
+    PERF.count('rows read: status archive', sum(len(v) for v in by_date.values()))
+    return by_date
+
+class CheckinLog:
+    """The check-in log, kept as one CSV per month in a folder named after STATUS_FILE.
+
+    manifest.json lists each month's files: the live CSV that save_checkin appends
+    to and, once `vets4u_admin.py checkins archive` has run, a gzipped compacted
+    copy of its older rows. Looking up a date only opens that month's files. A
+    single-file log from before partitioning is split up the first time it's used
+    and renamed to *.migrated. Writes to any month take the one partitions.lock,
+    so archiving never leaves lock files behind.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, path):
+        self.path = path
+        self.folder = os.path.splitext(path)[0]
+        self.manifest_path = os.path.join(self.folder, self.MANIFEST)
+        self.write_lock = os.path.join(self.folder, "partitions")
+        self.lock = threading.Lock()
+        self.manifest = None
+        self.manifest_sig = None
+
+    def file(self, name):
+        return os.path.join(self.folder, name)
+
+    def partitions(self):
+        """{month: {"live": file, "archive": file}} as of the manifest on disk."""
+        if os.path.exists(self.path):
+            self.migrate()
+        with self.lock:
+            sig = file_signature(self.manifest_path)
+            if self.manifest is None or sig != self.manifest_sig:
+                self.manifest, self.manifest_sig = self._read_manifest(), sig
+            return self.manifest['partitions']
+
+    def generation(self):
+        """Bumped whenever rows are rewritten rather than appended (migration, archiving)."""
+        self.partitions()
+        return self.manifest['generation']
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._scan()
+
+    def _scan(self):
+        """Rebuilds the manifest from the files in the folder (if it went missing)."""
+        partitions = {}
+        names = os.listdir(self.folder) if os.path.isdir(self.folder) else []
+        for name in sorted(names):
+            m = re.fullmatch(r"(\d{4}-\d{2}|other)\.csv(\.gz)?", name)
+            if m: partitions.setdefault(m.group(1), {})['archive' if m.group(2) else 'live'] = name
+        return {'version': 1, 'generation': 0, 'partitions': partitions}
+
+    @contextlib.contextmanager
+    def _editing_manifest(self):
+        """Yields the manifest, re-read under its lock, and writes it back atomically."""
+        os.makedirs(self.folder, exist_ok=True)
+        with file_lock(self.manifest_path):
+            manifest = self._read_manifest()
+            yield manifest
+            fd, tmp = tempfile.mkstemp(prefix="." + self.MANIFEST, suffix=".tmp", dir=self.folder)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.manifest_path)
+            with self.lock:
+                self.manifest, self.manifest_sig = manifest, file_signature(self.manifest_path)
+
+    def signatures(self):
+        """File signatures that change whenever any check-in does (archives only change with the manifest)."""
+        partitions = self.partitions()
+        return [self.manifest_sig] + [file_signature(self.file(p['live'])) for _, p in sorted(partitions.items()) if 'live' in p]
+
+    def migrate(self):
+        """Moves the rows of a single-file log into the monthly partitions. Returns rows moved."""
+        with file_lock(self.path):
+            if not os.path.exists(self.path):
+                return 0
+            with open(self.path, newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.reader(f))
+            header = [c.strip() for c in rows[0]] if rows else []
+            columns = [header.index(c) if c in header else None for c in CHECKIN_COLUMNS]
+            by_month, months = {}, {}
+            for row in rows[1:]:
+                if not any(row): continue
+                if len(row) != len(header) or header != CHECKIN_COLUMNS:
+                    row = [row[i] if i is not None and i < len(row) else '' for i in columns]
+                if row[0] not in months: months[row[0]] = partition_of(row[0])
+                by_month.setdefault(months[row[0]], []).append(row)
+            with self._editing_manifest() as manifest:
+                for month in by_month:
+                    manifest['partitions'].setdefault(month, {}).setdefault('live', f"{month}.csv")
+                manifest['generation'] += 1
+            for month, month_rows in by_month.items():
+                self._append_rows(self.file(manifest['partitions'][month]['live']), month_rows)
+            target = self.path + ".migrated"
+            if os.path.exists(target): target += datetime.now().strftime(".%Y%m%d%H%M%S")
+            os.replace(self.path, target)
+        PERF.count('check-ins migrated', sum(len(r) for r in by_month.values()))
+        return sum(len(r) for r in by_month.values())
+
+    def _append_rows(self, path, rows):
+        with file_lock(self.write_lock):
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            with open(path, "a", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                if new_file: writer.writerow(CHECKIN_COLUMNS)
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _register(self, month):
+        """Makes sure the manifest lists the month's live file."""
+        if 'live' not in self.partitions().get(month, {}):
+            with self._editing_manifest() as manifest:
+                manifest['partitions'].setdefault(month, {})['live'] = f"{month}.csv"
+
+    def append(self, row):
+        """Appends one check-in to its month's live file, through that file's group-commit queue."""
+        month = partition_of(row.get('Date'))
+        self._register(month)
+        append_queue(self.file(f"{month}.csv"), lock_path=self.write_lock).append(row)
+        # An archive of the month may have run in between and dropped the file from the manifest
+        self._register(month)
+
+    def refresh(self):
+        """Picks up a changed manifest. Returns True if it moved on."""
+        sig = self.manifest_sig
+        self.partitions()
+        return sig != self.manifest_sig
+
+    def statuses_on(self, date_str):
+        """Returns {name: latest status} for one day, in first check-in order."""
+        return self.statuses_for([date_str]).get(date_str, {})
+
+    def statuses_for(self, date_strs):
+        """{date: {name: latest status}} for several days, opening only their months' files."""
+        partitions = self.partitions()
+        by_month = {}
+        for d in date_strs:
+            by_month.setdefault(partition_of(d), []).append(d)
+        result = {}
+        for month, dates in by_month.items():
+            files = partitions.get(month)
+            if not files: continue
+            archived = DATA_CACHE.get(self.file(files['archive']), load_status_archive) if 'archive' in files else {}
+            live = status_log_reader(self.file(files['live'])).statuses_for(dates) if 'live' in files else {}
+            for d in dates:
+                if d in archived or d in live:
+                    result[d] = {**archived.get(d, {}), **live.get(d, {})}
+        return result
+
+    def read(self):
+        """The whole log as a DataFrame, month by month (archived rows before live ones)."""
+        frames = []
+        for month, files in sorted(self.partitions().items()):
+            for kind in ('archive', 'live'):
+                if kind in files and os.path.exists(self.file(files[kind])):
+                    frames.append(pd.read_csv(self.file(files[kind]), dtype=str))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CHECKIN_COLUMNS)
+
+    def read_since(self, cursor=None):
+        """As CsvStorage.read_checkins_since; the cursor is (generation, {live file: tail cursor})."""
+        generation, tails = cursor or (None, {})
+        reset = cursor is None or generation != self.generation()
+        frames, next_tails = [], {}
+        for month, files in sorted(self.partitions().items()):
+            if reset and 'archive' in files:
+                frames.append(pd.read_csv(self.file(files['archive']), dtype=str))
+            if 'live' in files:
+                path = self.file(files['live'])
+                rows, next_tails[path], replaced = tail_csv(path, None if reset else tails.get(path))
+                if replaced and not reset and path in tails:
+                    return self.read_since(None)
+                if len(rows): frames.append(rows)
+        rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CHECKIN_COLUMNS)
+        return rows, (self.manifest['generation'], next_tails), reset
+
+    def archive(self, before):
+        """Compacts every month before `before` ("YYYY-MM") into a gzipped CSV holding
+        each person's latest check-in per day. Returns the months archived."""
+        done = []
+        for month, files in sorted(self.partitions().items()):
+            live = self.file(f"{month}.csv")
+            if month == 'other' or month >= before or 'live' not in files:
+                continue
+            # Held until the live file is gone, so no check-in lands in it after it was read
+            with file_lock(self.write_lock):
+                with self._editing_manifest() as manifest:
+                    files = manifest['partitions'][month]
+                    frames = [pd.read_csv(self.file(files[k]), dtype=str, keep_default_na=False)
+                              for k in ('archive', 'live') if k in files and os.path.exists(self.file(files[k]))]
+                    rows = pd.concat(frames, ignore_index=True).reindex(columns=CHECKIN_COLUMNS).fillna('')
+                    rows = rows[rows['Name'] != '']
+                    keys = ['Date', 'Name']
+                    # First check-in order with the latest values, as StatusLogReader reads them
+                    rows = rows.drop_duplicates(keys)[keys].merge(rows.drop_duplicates(keys, keep='last'), on=keys, how='left')
+                    files['archive'] = f"{month}.csv.gz"
+                    fd, tmp = tempfile.mkstemp(prefix="." + files['archive'], suffix=".tmp", dir=self.folder)
+                    with os.fdopen(fd, "wb") as raw:
+                        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+                            f.write(rows.to_csv(index=False).encode("utf-8"))
+                        raw.flush()
+                        os.fsync(raw.fileno())
+                    os.replace(tmp, self.file(files['archive']))
+                    files.pop('live')
+                    manifest['generation'] += 1
+                with contextlib.suppress(FileNotFoundError): os.unlink(live)
+                # Left by versions that locked each month's file separately
+                with contextlib.suppress(FileNotFoundError): os.unlink(live + ".lock")
+            done.append(month)
+        return done
+
+_checkin_logs = {}
+
+def checkin_log(path=STATUS_FILE):
+    """Returns the process-wide partitioned log for a STATUS_FILE path."""
+    key = os.path.abspath(path)
+    with _status_readers_lock:
+        if key not in _checkin_logs:
+            _checkin_logs[key] = CheckinLog(path)
+        return _checkin_logs[key]
+
+class ForecastCache:
+    """Process-wide analyze_day results per data set and date, each kept with the inputs it came from.
+
+    Those inputs are the date's schedule row (or the legacy roster), the approved
+    absences overlapping it, its check-ins and the skills matrix. A lookup only
+    recomputes dates whose inputs changed, so after a check-in or a booking a
+    long forecast costs the days that booking touches.
+    """
+
+    MAX_DAYS = 5000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def results(self, key, date_strs, deps, compute):
+        """Results for date_strs; compute(i) is only called for dates whose deps[i] changed."""
+        with self.lock:
+            days = self.entries.setdefault(key, {})
+            found = [days.get(d) for d in date_strs]
+        results, stale = [], []
+        for i, entry in enumerate(found):
+            if entry is not None and entry[0] == deps[i]:
+                results.append(entry[1])
+            else:
+                results.append(None)
+                stale.append(i)
+        for i in stale:
+            results[i] = compute(i)
+        with self.lock:
+            self.hits += len(date_strs) - len(stale)
+            self.misses += len(stale)
+            for i in stale:
+                days.pop(date_strs[i], None)
+                days[date_strs[i]] = (deps[i], results[i])
+            while len(days) > self.MAX_DAYS:
+                del days[next(iter(days))]
+        PERF.count('forecast days reused', len(date_strs) - len(stale))
+        PERF.count('forecast days recomputed', len(stale))
+        return results
+
+    def invalidate(self, key=None):
+        with self.lock:
+            if key is None: self.entries.clear()
+            else: self.entries.pop(key, None)
+
+FORECAST_CACHE = ForecastCache()
+
+# Title rows above a tracker's header fit well inside this; the rest of the file isn't read to find it
+SNIFF_BYTES = 8 * 1024
+
+def find_header(path, *labels, limit=SNIFF_BYTES):
+    """(byte offset, cells) of the first row with a cell containing each label, case-insensitively.
+
+    Exported tracker sheets put title and blank rows above the real header. Only
+    the first `limit` bytes are read; returns (0, None) when no row matches there.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(limit)
+    lines = head.split(b'\n')
+    if len(head) == limit: lines.pop()  # may be cut off mid-row
+    wanted = [label.lower() for label in labels]
+    offset = 0
+    for line in lines:
+        text = line.decode('utf-8', errors='replace')
+        if all(w in text.lower() for w in wanted):
+            cells = next(csv.reader([text.rstrip('\r')]), [])
+            if all(any(w in c.lower() for c in cells) for w in wanted):
+                return offset, cells
+        offset += len(line) + 1
+    return 0, None
+
+def read_tracker(path, labels, text_columns):
+    """Parses a tracker CSV once, starting at the header row find_header locates.
+
+    Known columns are read as strings rather than type-inferred.
+    """
+    offset, header = find_header(path, *labels)
+    dtype = {c: str for c in header or [] if c.strip() in text_columns} or None
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return pd.read_csv(f, dtype=dtype)
+
+def load_skills(path):
+    snapshot = Snapshot.for_source(path, 'skills')
+    cached = snapshot.read() if snapshot else None
+    if cached:
+        return index_skills(frame_from_arrays(cached[0], cached[1]['columns']))
+    skills = read_tracker(path, ('Name', 'Opening'), ['Name'] + list(SKILL_COLUMNS))
+    PERF.count('rows read: skills', len(skills))
+    if snapshot:
+        arrays, columns = frame_to_arrays(skills)
+        snapshot.write(arrays, columns=columns)
+    return index_skills(skills)
+
+def index_skills(skills):
+    if 'Name' in skills.columns:
+        skills['Name'] = skills['Name'].astype(str).str.strip()
+        skills.set_index('Name', inplace=True)
+    return skills, SkillsIndex(skills)
+
+def load_holidays(path):
+    snapshot = Snapshot.for_source(path, 'holidays')
+    cached = snapshot.read() if snapshot else None
+    if cached:
+        arrays, meta = cached
+        index = AbsenceIndex.from_arrays({k[len('absence_'):]: v for k, v in arrays.items() if k.startswith('absence_')}, meta['absence'])
+        return frame_from_arrays(arrays, meta['columns']), index
+    holidays = read_tracker(path, ('Absence Start',), HOLIDAY_COLUMNS)
+    PERF.count('rows read: holidays', len(holidays))
+    holidays, index = index_holidays(holidays)
+    if snapshot:
+        arrays, columns = frame_to_arrays(holidays)
+        index_arrays, scalars = index.to_arrays()
+        arrays.update({'absence_' + k: v for k, v in index_arrays.items()})
+        snapshot.write(arrays, columns=columns, absence=scalars)
+    return holidays, index
+
+def index_holidays(holidays):
+    holidays.columns = [str(c).strip() for c in holidays.columns]
+    return holidays, AbsenceIndex(holidays)
+
+SCHEDULE_COLUMNS = ["Date", "Opener", "Downstairs", "Upstairs", "Vet Screening"]
+
+class ScheduleStore:
+    """The simple schedule as an in-memory {date: row} index over an append-only CSV.
+
+    Saves append one row and the last row for a date wins, so the file stays in
+    the vets4u_simple_schedule.csv format. Once superseded rows outnumber live
+    ones the file is compacted back to one row per date. Writes hold the file
+    lock and pick up rows other processes appended since this copy was read.
+    """
+
+    COMPACT_MIN_ROWS = 64
+
+    def __init__(self, path, df=None, signature=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.columns = list(SCHEDULE_COLUMNS)
+        self.file_columns = None
+        self.rows = {}
+        self.file_rows = 0
+        self.signature = signature
+        self._frame = None
+        if df is not None:
+            self._read_frame(df)
+
+    def _read_frame(self, df):
+        PERF.count('rows read: simple schedule', len(df))
+        # Keep the file's own column order so appended rows line up with its header
+        self.file_columns = list(df.columns)
+        self.columns = self.file_columns + [c for c in SCHEDULE_COLUMNS if c not in self.file_columns]
+        self.rows = {}
+        if 'Date' in df.columns:
+            for row in df.to_dict('records'):
+                self.rows[row['Date']] = row
+        self.file_rows = len(df)
+        self._frame = None
+
+    @classmethod
+    def load(cls, path):
+        signature = file_signature(path)
+        return cls(path, pd.read_csv(path) if signature is not None else None, signature)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, date_str):
+        return self.rows.get(date_str)
+
+    def frame(self):
+        """The current schedule as a DataFrame, one row per date."""
+        if self._frame is None:
+            self._frame = pd.DataFrame(list(self.rows.values()), columns=self.columns)
+        return self._frame
+
+    def upsert(self, row):
+        with self.lock, self._write_lock():
+            self._sync()
+            row = {c: (None if row.get(c) == "" else row.get(c)) for c in self.columns}
+            self._persist(row)
+            self.rows.pop(row['Date'], None)
+            self.rows[row['Date']] = row
+            self._frame = None
+            self._after_write()
+
+    def _write_lock(self):
+        return file_lock(self.path)
+
+    def _sync(self):
+        """Re-reads the file if another writer changed it since we last did."""
+        signature = file_signature(self.path)
+        if signature is not None and signature != self.signature:
+            self._read_frame(pd.read_csv(self.path))
+
+    def _persist(self, row):
+        if self.file_columns != self.columns and os.path.exists(self.path):
+            # The header lacks some canonical columns; rewrite it once rather than append under it
+            self._compact()
+        new_file = not os.path.exists(self.path)
+        pd.DataFrame([row], columns=self.columns).to_csv(self.path, mode='w' if new_file else 'a', header=new_file, index=False)
+        self.file_rows = 1 if new_file else self.file_rows + 1
+        self.file_columns = list(self.columns)
+
+    def _after_write(self):
+        if self.file_rows > max(self.COMPACT_MIN_ROWS, 2 * len(self.rows)):
+            self._compact()
+        self.signature = file_signature(self.path)
+        DATA_CACHE.put(self.path, self)
+
+    def compact(self):
+        with self.lock, self._write_lock():
+            self._sync()
+            self._compact()
+            self.signature = file_signature(self.path)
+
+    def _compact(self):
+        atomic_write_csv(self.frame(), self.path, index=False)
+        self.file_rows = len(self.rows)
+        self.file_columns = list(self.columns)
+
+def load_legacy_schedule(path):
+    if os.path.exists(path):
+        df = pd.read_csv(path, header=None, names=range(20))
+        PERF.count('rows read: legacy schedule', len(df))
+        return df, LegacyRoster(df)
+    return None, LegacyRoster()
+
+def simple_roster(row):
+    """{name: [roles]} for one row of the simple schedule."""
+    roster = {}
+    for role in ['Opener', 'Downstairs', 'Upstairs', 'Vet Screening']:
+        if role in row and pd.notna(row[role]):
+            names = [n.strip() for n in str(row[role]).split(',')]
+            for n in names:
+                if n not in roster: roster[n] = []
+                roster[n].append(role)
+    return roster
+
+LEGACY_ROLES = ['Opener', 'Downstairs', 'Upstairs', 'Vet Screening']
+_DATE_IN_TEXT = re.compile(r"\d{4}-\d{2}-\d{2}|\d{1,2}[/.]\d{1,2}[/.]\d{2,4}")
+
+class LegacyRoster:
+    """The legacy 4-Week Schedule sheet compiled into a date-addressable roster table.
+
+    Every "WEEK ... CONFIRMED" block is parsed once into {weekday: {role: [names]}}.
+    Dates map onto the blocks as a rotation from the first dated block header if
+    the sheet has one, else from LEGACY_ROTATION_START if set. With neither,
+    every date shows the first block, as the sheet was always read.
+    """
+
+    def __init__(self, df=None):
+        self.weeks = []
+        self.anchor = None
+        if LEGACY_ROTATION_START:
+            start = datetime.strptime(LEGACY_ROTATION_START, "%Y-%m-%d")
+            self.anchor = start - timedelta(days=start.weekday())
+        if df is None or df.empty:
+            return
+        rows = [str(values) for values in df.to_numpy()]
+        starts = [i for i, row_str in enumerate(rows) if "WEEK" in row_str and "CONFIRMED" in row_str] or [5]
+        for start_row in starts:
+            self.weeks.append(self._compile_week(df, start_row))
+
+        marker = starts[0]
+        for row_str in rows[marker:marker + 2]:
+            found = _DATE_IN_TEXT.search(row_str)
+            if found is None: continue
+            try:
+                first = pd.to_datetime(found.group(0), dayfirst='-' not in found.group(0))
+            except (ValueError, OverflowError):
+                continue
+            self.anchor = datetime(first.year, first.month, first.day) - timedelta(days=first.weekday())
+            break
+
+    @staticmethod
+    def _compile_week(df, start_row):
+        if start_row + 5 >= len(df):
+            return None
+        week = {}
+        for day_idx in range(5):
+            col_idx = day_idx + 1
+            roles = {}
+            for offset, role in enumerate(LEGACY_ROLES):
+                raw_names = df.iloc[start_row + 2 + offset, col_idx]
+                if pd.isna(raw_names) or str(raw_names).lower() == 'nan': continue
+                roles[role] = [n.strip() for n in str(raw_names).replace('+', ',').replace('/', ',').split(',')]
+            week[day_idx] = roles
+        return week
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def week_number(self, query_date):
+        """1-based position of query_date's week in the rotation."""
+        if self.anchor is None:
+            return 1
+        monday = datetime(query_date.year, query_date.month, query_date.day) - timedelta(days=query_date.weekday())
+        return ((monday - self.anchor).days // 7) % len(self.weeks) + 1
+
+    def roles_on(self, query_date):
+        """{role: [names]} for a date, or None if the sheet doesn't cover it."""
+        if not self.weeks or query_date.weekday() > 4:
+            return None
+        week = self.weeks[self.week_number(query_date) - 1]
+        return None if week is None else week[query_date.weekday()]
+
+    def lookup(self, query_date):
+        """(roster, status) for a date, in get_scheduled_staff's format."""
+        if not self.weeks: return {}, "No Schedule Data"
+        if query_date.weekday() > 4: return {}, "Weekend - Closed"
+        roles = self.roles_on(query_date)
+        if roles is None: return {}, "Schedule Data Error"
+
+        roster = {}
+        for role, names in roles.items():
+            for name in names:
+                if name not in roster: roster[name] = []
+                roster[name].append(role)
+        return roster, "Open"
+
+DEFAULT_STAFF = [
+    {"Name": "Dipesh", "Opening": "YES", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
+    {"Name": "Nidhesh", "Opening": "YES", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
+    {"Name": "Varsha", "Opening": "NO", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
+    {"Name": "VJ", "Opening": "NO", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
+    {"Name": "Rushil", "Opening": "NO", "Dispensing": "NO", "Second Check": "NO", "Vet Screening": "NO"},
+    {"Name": "Rak", "Opening": "YES", "Dispensing": "NO", "Second Check": "NO", "Vet Screening": "NO"}
+]
+HOLIDAY_COLUMNS = ["Name", "Request Date", "Absence Start", "Absence End", "Type", "Status", "Notes"]
+CHECKIN_COLUMNS = ["Date", "Name", "Status", "Note", "Timestamp"]
+
+class CsvStorage:
+    """Default backend: the tracker CSV exports plus the app's own CSV files.
+
+    Parsed datasets go through DATA_CACHE, so every session in the process
+    shares one copy per file.
+    """
+
+    name = "csv"
+
+    def __init__(self, files, status_file=STATUS_FILE, schedule_file=SIMPLE_SCHEDULE_FILE):
+        self.files = files
+        self.status_file = status_file
+        self.schedule_file = schedule_file
+
+    @classmethod
+    def in_folder(cls, folder):
+        """A CsvStorage for the usual file names inside folder."""
+        files = {k: os.path.join(folder, v) for k, v in TRACKER_FILES.items()}
+        return cls(files, os.path.join(folder, STATUS_FILE), os.path.join(folder, SIMPLE_SCHEDULE_FILE))
+
+    @property
+    def key(self):
+        """Identifies this data set in process-wide caches."""
+        return os.path.abspath(self.status_file)
+
+    def fingerprint(self):
+        """Changes whenever any of the data set's files does."""
+        return [file_signature(p) for p in [*self.files.values(), self.schedule_file]] + self.checkin_log().signatures()
+
+    def ensure_templates(self):
+        """Creates missing tracker files. Returns True if demo staff were written."""
+        demo = False
+        if not os.path.exists(self.files['skills']):
+            with file_lock(self.files['skills']):
+                if not os.path.exists(self.files['skills']):
+                    atomic_write_csv(pd.DataFrame(DEFAULT_STAFF), self.files['skills'], index=False)
+                    demo = True
+        if not os.path.exists(self.files['holidays']):
+            with file_lock(self.files['holidays']):
+                if not os.path.exists(self.files['holidays']):
+                    atomic_write_csv(pd.DataFrame(columns=HOLIDAY_COLUMNS[:-1]), self.files['holidays'], index=False)
+        return demo
+
+    def load_skills(self):
+        return DATA_CACHE.get(self.files['skills'], load_skills)
+
+    def load_holidays(self):
+        return DATA_CACHE.get(self.files['holidays'], load_holidays)
+
+    def load_schedule(self):
+        return DATA_CACHE.get(self.schedule_file, ScheduleStore.load)
+
+    def empty_schedule(self):
+        """An unloaded schedule store over this backend, for a dashboard whose load failed."""
+        return ScheduleStore(self.schedule_file)
+
+    def load_legacy_schedule(self):
+        return DATA_CACHE.get(self.files['schedule'], load_legacy_schedule)
+
+    def status_log(self):
+        return self.checkin_log()
+
+    def read_checkins(self):
+        """The whole check-in log as a DataFrame."""
+        return self.checkin_log().read()
+
+    def checkin_log(self):
+        return checkin_log(self.status_file)
+
+    def read_checkins_since(self, cursor=None):
+        """Check-ins appended since cursor, for consumers that keep their own aggregates.
+
+        Returns (rows, cursor, reset). reset is True when rows is the whole log
+        because there was no cursor or the log was migrated, archived or replaced.
+        """
+        return self.checkin_log().read_since(cursor)
+
+    def append_checkin(self, row):
+        self.checkin_log().append(row)
+
+    def append_holiday(self, row):
+        """Appends a booking and returns the tracker as written."""
+        path = self.files['holidays']
+        with file_lock(path):
+            if os.path.exists(path):
+                try:
+                    df = read_tracker(path, ('Absence Start',), HOLIDAY_COLUMNS)
+                except:
+                    df = pd.DataFrame(columns=HOLIDAY_COLUMNS)
+            else:
+                df = pd.DataFrame(columns=HOLIDAY_COLUMNS)
+
+            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+            atomic_write_csv(df, path, index=False)
+        DATA_CACHE.invalidate(path)
+        return df
+
+    def save_skills(self, df):
+        with file_lock(self.files['skills']):
+            atomic_write_csv(df, self.files['skills'])
+        DATA_CACHE.invalidate(self.files['skills'])
+
+class SqliteScheduleStore(ScheduleStore):
+    """ScheduleStore persisted as one row per date in the SQLite backend."""
+
+    def __init__(self, storage, df=None):
+        self.storage = storage
+        super().__init__(storage.path, df)
+        self.file_rows = len(self.rows)
+
+    def _write_lock(self):
+        return contextlib.nullcontext()
+
+    def _sync(self):
+        pass
+
+    def _persist(self, row):
+        self.storage.upsert_schedule_row(row)
+
+    def _after_write(self):
+        self.storage.bump('schedule', self)
+
+    def _compact(self):
+        pass
+
+class SqliteStatusLog:
+    """Check-in lookups answered by indexed queries on the checkins table."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def refresh(self):
+        return False
+
+    def statuses_on(self, date_str):
+        return self.statuses_for([date_str]).get(date_str, {})
+
+    def statuses_for(self, date_strs):
+        wanted = set(date_strs)
+        if not wanted:
+            return {}
+        rows = self.storage.conn().execute(
+            'SELECT Date, Name, Status FROM checkins WHERE Date BETWEEN ? AND ? ORDER BY id',
+            (min(wanted), max(wanted)))
+        by_date = {}
+        for date_str, name, status in rows:
+            if date_str in wanted and name:
+                by_date.setdefault(date_str, {})[name] = status
+        return by_date
+
+class SqliteStorage:
+    """Optional backend keeping every dataset in one local SQLite database (WAL mode).
+
+    Each dataset has a version counter bumped on write; parsed copies are reused
+    until the counter moves, so a rerun costs one small query.
+    """
+
+    name = "sqlite"
+    DATASETS = ['skills', 'holidays', 'schedule', 'legacy_schedule', 'checkins']
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS versions (dataset TEXT PRIMARY KEY, version INTEGER NOT NULL)',
+        'CREATE TABLE IF NOT EXISTS checkins (id INTEGER PRIMARY KEY AUTOINCREMENT, Date TEXT, Name TEXT, Status TEXT, Note TEXT, Timestamp TEXT)',
+        'CREATE INDEX IF NOT EXISTS idx_checkins_date ON checkins (Date)',
+        'CREATE INDEX IF NOT EXISTS idx_checkins_name_date ON checkins (Name, Date)',
+        'CREATE TABLE IF NOT EXISTS holidays ("Name" TEXT, "Request Date" TEXT, "Absence Start" TEXT, "Absence End" TEXT, "Type" TEXT, "Status" TEXT, "Notes" TEXT)',
+        'CREATE INDEX IF NOT EXISTS idx_holidays_range ON holidays ("Status", "Absence Start", "Absence End")',
+        'CREATE INDEX IF NOT EXISTS idx_holidays_name_range ON holidays ("Name", "Absence Start", "Absence End")',
+        'CREATE TABLE IF NOT EXISTS schedule ("Date" TEXT PRIMARY KEY, "Opener" TEXT, "Downstairs" TEXT, "Upstairs" TEXT, "Vet Screening" TEXT)',
+    ]
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.cache = {}
+        with self.conn() as conn:
+            for stmt in self.SCHEMA:
+                conn.execute(stmt)
+            conn.executemany('INSERT OR IGNORE INTO versions VALUES (?, 0)', [(d,) for d in self.DATASETS])
+
+    @property
+    def key(self):
+        return os.path.abspath(self.path)
+
+    def fingerprint(self):
+        return sorted(self._versions().items())
+
+    def conn(self):
+        """This thread's connection; SQLite connections can't be shared across threads."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def _has_table(self, table):
+        return self.conn().execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is not None
+
+    def _versions(self):
+        return dict(self.conn().execute('SELECT dataset, version FROM versions'))
+
+    def _cached(self, dataset, loader):
+        version = self._versions().get(dataset, 0)
+        with self.lock:
+            entry = self.cache.get(dataset)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+        value = loader()
+        with self.lock:
+            self.cache[dataset] = (version, value)
+        return value
+
+    def bump(self, dataset, value=None, conn=None):
+        """Marks a dataset as changed; value, if given, is the already-current parsed copy."""
+        conn = conn or self.conn()
+        with conn:
+            conn.execute('UPDATE versions SET version = version + 1 WHERE dataset = ?', (dataset,))
+        with self.lock:
+            if value is None:
+                self.cache.pop(dataset, None)
+            else:
+                self.cache[dataset] = (self._versions()[dataset], value)
+
+    def _ensure_columns(self, conn, table, columns):
+        existing = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+        for c in columns:
+            if c not in existing:
+                conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{c}" TEXT')
+
+    def _insert(self, conn, table, rows, columns):
+        self._ensure_columns(conn, table, columns)
+        cols = ', '.join(f'"{c}"' for c in columns)
+        marks = ', '.join('?' for _ in columns)
+        conn.executemany(f'INSERT INTO "{table}" ({cols}) VALUES ({marks})', rows)
+
+    def ensure_templates(self):
+        if self._has_table('skills'):
+            return False
+        self.save_skills(pd.DataFrame(DEFAULT_STAFF).set_index('Name'))
+        return True
+
+    def load_skills(self):
+        return self._cached('skills', lambda: index_skills(pd.read_sql('SELECT * FROM skills ORDER BY rowid', self.conn())))
+
+    def load_holidays(self):
+        return self._cached('holidays', lambda: index_holidays(pd.read_sql('SELECT * FROM holidays ORDER BY rowid', self.conn())))
+
+    def load_schedule(self):
+        return self._cached('schedule', lambda: SqliteScheduleStore(self, pd.read_sql('SELECT * FROM schedule ORDER BY rowid', self.conn())))
+
+    def empty_schedule(self):
+        return SqliteScheduleStore(self)
+
+    def load_legacy_schedule(self):
+        def load():
+            if not self._has_table('legacy_schedule'):
+                return None, LegacyRoster()
+            df = pd.read_sql('SELECT * FROM legacy_schedule ORDER BY "row"', self.conn()).drop(columns='row')
+            df.columns = [int(c) for c in df.columns]
+            return df, LegacyRoster(df)
+        return self._cached('legacy_schedule', load)
+
+    def status_log(self):
+        return SqliteStatusLog(self)
+
+    def read_checkins(self):
+        return pd.read_sql('SELECT Date, Name, Status, Note, Timestamp FROM checkins ORDER BY id', self.conn())
+
+    def read_checkins_since(self, cursor=None):
+        """As CsvStorage.read_checkins_since; the cursor is (last id, rows up to it)."""
+        conn = self.conn()
+        last_id, seen = cursor or (0, 0)
+        reset = cursor is None or conn.execute('SELECT COUNT(*) FROM checkins WHERE id <= ?', (last_id,)).fetchone()[0] != seen
+        if reset:
+            last_id, seen = 0, 0
+        rows = pd.read_sql('SELECT id, Date, Name, Status, Note, Timestamp FROM checkins WHERE id > ? ORDER BY id',
+                           conn, params=(last_id,))
+        if len(rows):
+            last_id, seen = int(rows['id'].iloc[-1]), seen + len(rows)
+        return rows.drop(columns='id'), (last_id, seen), reset
+
+    def append_checkin(self, row):
+        conn = self.conn()
+        with conn:
+            self._insert(conn, 'checkins', [[row.get(c) for c in CHECKIN_COLUMNS]], CHECKIN_COLUMNS)
+        self.bump('checkins')
+
+    def append_holiday(self, row):
+        conn = self.conn()
+        with conn:
+            self._insert(conn, 'holidays', [list(row.values())], list(row.keys()))
+        self.bump('holidays')
+        return pd.read_sql('SELECT * FROM holidays ORDER BY rowid', conn)
+
+    def upsert_schedule_row(self, row):
+        conn = self.conn()
+        with conn:
+            self._ensure_columns(conn, 'schedule', row.keys())
+            cols = ', '.join(f'"{c}"' for c in row)
+            marks = ', '.join('?' for _ in row)
+            conn.execute(f'INSERT OR REPLACE INTO schedule ({cols}) VALUES ({marks})', list(row.values()))
+
+    def save_skills(self, df):
+        conn = self.conn()
+        with conn:
+            df.reset_index().astype(object).where(df.reset_index().notna(), None).to_sql('skills', conn, if_exists='replace', index=False)
+        self.bump('skills')
+
+    def import_csv(self, source):
+        """One-shot import of a CsvStorage's files, using the same header sniffing.
+
+        Replaces whatever the database held. Returns the row count per dataset.
+        """
+        def text(df):
+            return df.astype(object).where(df.notna(), None)
+
+        skills, _ = load_skills(source.files['skills']) if os.path.exists(source.files['skills']) else (pd.DataFrame(DEFAULT_STAFF).set_index('Name'), None)
+        holidays, _ = load_holidays(source.files['holidays']) if os.path.exists(source.files['holidays']) else (pd.DataFrame(columns=HOLIDAY_COLUMNS), None)
+        schedule = ScheduleStore.load(source.schedule_file).frame()
+        legacy, _ = load_legacy_schedule(source.files['schedule'])
+        checkins = source.read_checkins()
+        checkins = checkins[checkins['Name'].notna()] if 'Name' in checkins.columns else checkins.iloc[0:0]
+
+        conn = self.conn()
+        with conn:
+            text(skills.reset_index()).to_sql('skills', conn, if_exists='replace', index=False)
+            conn.execute('DELETE FROM holidays')
+            holidays = holidays.loc[:, [not str(c).startswith('Unnamed') for c in holidays.columns]]
+            self._insert(conn, 'holidays', text(holidays).values.tolist(), [str(c) for c in holidays.columns])
+            conn.execute('DELETE FROM schedule')
+            self._insert(conn, 'schedule', text(schedule).values.tolist(), list(schedule.columns))
+            conn.execute('DROP TABLE IF EXISTS legacy_schedule')
+            if legacy is not None:
+                grid = text(legacy)
+                grid.columns = [str(c) for c in grid.columns]
+                grid.insert(0, 'row', range(len(grid)))
+                grid.to_sql('legacy_schedule', conn, index=False)
+            conn.execute('DELETE FROM checkins')
+            checkins = checkins.reindex(columns=CHECKIN_COLUMNS)
+            self._insert(conn, 'checkins', text(checkins).values.tolist(), CHECKIN_COLUMNS)
+        for dataset in self.DATASETS:
+            self.bump(dataset)
+        return {'skills': len(skills), 'holidays': len(holidays), 'schedule': len(schedule),
+                'legacy_schedule': 0 if legacy is None else len(legacy), 'checkins': len(checkins)}
+
+_sqlite_storages = {}
+
+def open_storage(spec=None, files=None, folder=None):
+    """Returns the storage backend named by spec (default: the VETS4U_STORAGE setting).
+
+    With a folder, CSV files and relative SQLite paths are resolved inside it.
+    """
+    spec = spec or STORAGE
+    if spec.startswith("sqlite:"):
+        path = os.path.abspath(os.path.join(folder or "", spec[len("sqlite:"):]))
+        with _status_readers_lock:
+            if path not in _sqlite_storages:
+                _sqlite_storages[path] = SqliteStorage(path)
+            return _sqlite_storages[path]
+    if spec != "csv":
+        raise ValueError(f"Unknown storage backend: {spec}")
+    return CsvStorage.in_folder(folder) if folder is not None else CsvStorage(files)
+
+class StatusTable:
+    """Opt-in materialized analyze_day results, one row per date, in a SQLite file.
+
+    Saves are recorded as events (check-in, holiday, schedule, skills) and each
+    event recomputes only the dates it affects, so reading a day is one indexed
+    query. The table covers WINDOW_DAYS either side of today. It also stores the
+    data set's fingerprint as of the last event; if the files changed some other
+    way, sync() rebuilds it from them. verify() checks every row against a fresh
+    computation.
+    """
+
+    WINDOW_DAYS = 365
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS day_status (date TEXT PRIMARY KEY, status TEXT, overall_status TEXT, '
+        'count INTEGER, openers INTEGER, checkers INTEGER, result TEXT NOT NULL, updated TEXT)',
+        'CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, payload TEXT, dates INTEGER, at TEXT)',
+        'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)',
+    ]
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        with self.conn() as conn:
+            for stmt in self.SCHEMA:
+                conn.execute(stmt)
+
+    def conn(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def _meta(self):
+        return dict(self.conn().execute('SELECT key, value FROM meta'))
+
+    def window(self):
+        meta = self._meta()
+        return meta.get('window_start'), meta.get('window_end')
+
+    def _write(self, conn, app, days):
+        stamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for d in days:
+            result = app.compute_day(d)
+            rows.append((d.strftime("%Y-%m-%d"), result.get('status', 'OPEN'), result.get('overall_status'), result.get('count', 0),
+                         result.get('openers', 0), result.get('checkers', 0), json.dumps(result), stamp))
+        conn.executemany('INSERT OR REPLACE INTO day_status VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        PERF.count('status table days written', len(rows))
+
+    def _set_meta(self, conn, **values):
+        conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', list(values.items()))
+
+    @staticmethod
+    def _days(start_str, end_str):
+        start, end = datetime.strptime(start_str, "%Y-%m-%d"), datetime.strptime(end_str, "%Y-%m-%d")
+        return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    def _wanted_window(self):
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        return ((today - timedelta(days=self.WINDOW_DAYS)).strftime("%Y-%m-%d"),
+                (today + timedelta(days=self.WINDOW_DAYS)).strftime("%Y-%m-%d"))
+
+    def rebuild(self, app):
+        """Recomputes every date in the window from the raw data. Returns the number of days."""
+        start, end = self._wanted_window()
+        days = self._days(start, end)
+        with self.lock, self.conn() as conn:
+            conn.execute('DELETE FROM day_status')
+            self._write(conn, app, days)
+            self._set_meta(conn, window_start=start, window_end=end, fingerprint=json.dumps(app.storage.fingerprint()))
+            conn.execute('INSERT INTO events (kind, payload, dates, at) VALUES (?, ?, ?, ?)',
+                         ('rebuild', '{}', len(days), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        PERF.count('status table rebuilds')
+        return len(days)
+
+    def sync(self, app):
+        """Rebuilds if the data changed outside recorded events, and extends the window as days pass."""
+        meta = self._meta()
+        if meta.get('fingerprint') != json.dumps(app.storage.fingerprint()) or 'window_start' not in meta:
+            return self.rebuild(app)
+        start, end = self._wanted_window()
+        if end > meta['window_end']:
+            first = datetime.strptime(meta['window_end'], "%Y-%m-%d") + timedelta(days=1)
+            with self.lock, self.conn() as conn:
+                self._write(conn, app, self._days(first.strftime("%Y-%m-%d"), end))
+                self._set_meta(conn, window_end=end)
+        return 0
+
+    def record(self, app, kind, start=None, end=None, before=None):
+        """Applies one event: recomputes the dates in [start, end] (every date when omitted).
+
+        before is the data set's fingerprint just ahead of the save. If it isn't the
+        one stored with the last event, the files also changed some other way, so
+        the app reloads them and the whole table is rebuilt instead.
+        """
+        meta = self._meta()
+        if 'window_start' not in meta:
+            return self.rebuild(app)
+        if before is not None and meta.get('fingerprint') != json.dumps(before):
+            app.ensure_data_loaded()
+            return self.rebuild(app)
+        lo = max(start or meta['window_start'], meta['window_start'])
+        hi = min(end or start or meta['window_end'], meta['window_end'])
+        days = self._days(lo, hi) if lo <= hi else []
+        with self.lock, self.conn() as conn:
+            self._write(conn, app, days)
+            self._set_meta(conn, fingerprint=json.dumps(app.storage.fingerprint()))
+            conn.execute('INSERT INTO events (kind, payload, dates, at) VALUES (?, ?, ?, ?)',
+                         (kind, json.dumps({'start': start, 'end': end}), len(days), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        return len(days)
+
+    def get(self, app, date_str):
+        """The stored result for a date, or None if it's outside the window or the table is stale."""
+        row = self.conn().execute(
+            "SELECT (SELECT value FROM meta WHERE key = 'fingerprint'), result FROM day_status WHERE date = ?", (date_str,)).fetchone()
+        if row is None or row[0] != json.dumps(app.storage.fingerprint()):
+            return None
+        return json.loads(row[1])
+
+    def verify(self, app):
+        """Dates whose stored result differs from analyze_day computed now."""
+        return [date_str for date_str, result in self.conn().execute('SELECT date, result FROM day_status ORDER BY date')
+                if json.loads(result) != app.compute_day(datetime.strptime(date_str, "%Y-%m-%d"))]
+
+_status_tables = {}
+
+def open_status_table(path, folder=None):
+    """The process-wide StatusTable for a path (resolved inside folder when relative)."""
+    path = os.path.abspath(os.path.join(folder or "", path))
+    with _status_readers_lock:
+        if path not in _status_tables:
+            _status_tables[path] = StatusTable(path)
+        return _status_tables[path]
+
+ALERT_SHORT_STAFFED = "CRITICAL: Staff count < 2. CLOSE PHARMACY."
+ALERT_NO_BACKUP = "WARNING: No Backup."
+ALERT_NO_OPENER = "CRITICAL: No Opener."
+ALERT_FEW_CHECKERS = "CRITICAL: Dispensing Halted (<2 Checkers)."
+
+def apply_checkins(absent_staff, status_map):
+    """Overlays the day's check-ins on booked absences. Returns (absent_staff, extras)."""
+    extras = {}  # used as an ordered set, so results don't depend on string hashing
+    for name, status in status_map.items():
+        if status in ['Sick', 'Holiday', 'Late', 'Absent']:
+            absent_staff[name] = f"Reported: {status}"
+            if name in extras: del extras[name]
+        elif status == 'Present':
+            if name in absent_staff: del absent_staff[name]
+            extras[name] = True
+    return absent_staff, list(extras)
+
+def resolve_roster(roster, status, absences, extras):
+    """Splits a day's roster into active, late and absent staff.
+
+    Returns None when the day is closed, else (roster, active_staff, late_staff, sick_staff).
+    """
+    if status != "Open": 
+        if extras:
+            status = "Open"
+            roster = {}
+        else:
+            return None
+
+    for name in extras:
+        if name not in roster:
+            roster[name] = ["Flexible / Checked-In"]
+
+    active_staff = []
+    late_staff = []
+    sick_staff = []
+    
+    # Roster order, then anyone only in absences; a set here would reorder between processes
+    all_names = list(dict.fromkeys([*roster, *absences]))
+    
+    for name in all_names:
+        if name in absences:
+            reason = absences[name]
+            if "Late" in reason:
+                late_staff.append({'Name': name, 'Reason': reason, 'Role': ', '.join(roster.get(name, ['Unassigned']))})
+            else:
+                sick_staff.append({'Name': name, 'Reason': reason})
+        elif name in roster:
+            active_staff.append(name)
+    return roster, active_staff, late_staff, sick_staff
+
+def staffing_alerts(count, openers, checkers):
+    """Applies the staffing rules to a day's metrics. Returns (alerts, overall_status)."""
+    alerts = []
+    overall_status = "GREEN"
+    if count < 2:
+        alerts.append(ALERT_SHORT_STAFFED)
+        overall_status = "RED"
+    elif count == 2:
+        alerts.append(ALERT_NO_BACKUP)
+        if overall_status != "RED": overall_status = "AMBER"
+    if openers < 1:
+        alerts.append(ALERT_NO_OPENER)
+        overall_status = "RED"
+    if checkers < 2: 
+        alerts.append(ALERT_FEW_CHECKERS)
+        overall_status = "RED"
+    return alerts, overall_status
+
+LEAVE_IMPACT_COLUMNS = ["Date", "Day", "Before", "After", "Staff", "Alerts"]
+
+class Vets4uDashboard:
+    def __init__(self, storage=None, data_dir=None):
+        self.data_dir = data_dir
+        if data_dir is None:
+            self.files = dict(TRACKER_FILES)
+        else:
+            self.files = {k: os.path.join(data_dir, v) for k, v in TRACKER_FILES.items()}
+        self.storage = storage or open_storage(files=self.files, folder=data_dir)
+        self.data = {}
+        self.absence_index = AbsenceIndex()
+        self.skills_index = SkillsIndex()
+        self.legacy_roster = LegacyRoster()
+        self.schedule = self.storage.empty_schedule()
+        self.status_log = self.storage.status_log()
+        self.using_demo_data = False
+        self.load_error = None
+        self.status_table = open_status_table(STATUS_TABLE, data_dir) if STATUS_TABLE else None
+        self.ensure_data_loaded()
+        if self.status_table is not None and self.load_error is None:
+            self.status_table.sync(self)
+
+    @timed("ensure_data_loaded")
+    def ensure_data_loaded(self):
+        """Loads data. If files missing, creates templates."""
+        self.load_error = None
+        try:
+            self.using_demo_data = self.storage.ensure_templates()
+            self.data['skills'], self.skills_index = self.storage.load_skills()
+            self.data['holidays'], self.absence_index = self.storage.load_holidays()
+            self.schedule = self.storage.load_schedule()
+            self.data['simple_schedule'] = self.schedule.frame()
+            self.data['legacy_schedule'], self.legacy_roster = self.storage.load_legacy_schedule()
+            return True
+
+        except Exception as e:
+            self.load_error = e
+            return False
+
+    @timed("get_scheduled_staff")
+    def get_scheduled_staff(self, query_date):
+        row = self.schedule.get(query_date.strftime("%Y-%m-%d"))
+        if row is not None:
+            return simple_roster(row), "Open"
+        return self.legacy_roster.lookup(query_date)
+
+    def get_scheduled_range(self, days):
+        """get_scheduled_staff for many days, looking each schedule up once."""
+        result = []
+        for d in days:
+            row = self.schedule.get(d.strftime("%Y-%m-%d"))
+            if row is not None:
+                result.append((simple_roster(row), "Open"))
+            else:
+                result.append(self.legacy_roster.lookup(d))
+        return result
+
+    @timed("get_status_updates")
+    def get_status_updates(self, date_obj):
+        check_date = date_obj.strftime("%Y-%m-%d")
+        absent_staff = self.absence_index.absent_on(date_obj)
+        status_map = self.status_log.statuses_on(check_date)
+        return apply_checkins(absent_staff, status_map)
+
+    @timed("analyze_day")
+    def analyze_day(self, date_obj):
+        if self.status_table is not None:
+            stored = self.status_table.get(self, date_obj.strftime("%Y-%m-%d"))
+            if stored is not None:
+                return stored
+        return self.compute_day(date_obj)
+
+    def compute_day(self, date_obj):
+        """analyze_day worked out from the loaded data, bypassing the status table."""
+        roster, status = self.get_scheduled_staff(date_obj)
+        absences, extras = self.get_status_updates(date_obj)
+
+        resolved = resolve_roster(roster, status, absences, extras)
+        if resolved is None:
+            return {'status': 'CLOSED', 'msg': status, 'count': 0}
+        roster, active_staff, late_staff, sick_staff = resolved
+        
+        metrics = {
+            'count': len(active_staff), 
+            'openers': 0, 
+            'checkers': 0, 
+            'vet_screen': False, 
+            'staff_details': [], 
+            'late_details': late_staff,
+            'sick_details': sick_staff
+        }
+        
+        for name in active_staff:
+            caps = self.skills_index.get(name)
+            can_open, can_check = bool(caps & SKILL_OPENING), bool(caps & SKILL_SECOND_CHECK)
+            if can_open: metrics['openers'] += 1
+            if can_check: metrics['checkers'] += 1
+            
+            roles = roster.get(name, ["Checked-In"])
+            if 'Vet Screening' in roles: metrics['vet_screen'] = True
+            
+            metrics['staff_details'].append({
+                'Name': name, 
+                'Role': ', '.join(roles), 
+                'Skills': f"{'🔑' if can_open else ''}{'💊' if can_check else ''}"
+            })
+
+        metrics['alerts'], metrics['overall_status'] = staffing_alerts(metrics['count'], metrics['openers'], metrics['checkers'])
+        return metrics
+
+    def _absences_by_day(self, days, keys):
+        """absent_on for consecutive days: one index query for the whole range, spread
+        over its days in tracker row order so the last booking per person wins."""
+        day_absences = [{} for _ in days]
+        if days:
+            base = pd.Timestamp(keys[0])
+            for name, typ, start, end in self.absence_index.absent_between(days[0], days[-1]):
+                first = max((start.normalize() - base).days + (start != start.normalize()), 0)
+                last = min((end - base).days, len(days) - 1)
+                for i in range(first, last + 1):
+                    day_absences[i][name] = typ
+        return day_absences
+
+    def resolve_range(self, days):
+        """resolve_roster for consecutive days, from one absence query and one check-in read.
+
+        Returns (check-ins, resolve_roster result or None when closed, schedule status)
+        per day; analyze_range and the risk simulator build on it.
+        """
+        keys = [d.strftime("%Y-%m-%d") for d in days]
+        day_absences = self._absences_by_day(days, keys)
+        checkins = self.status_log.statuses_for(keys)
+        result = []
+        for i, (roster, sched_status) in enumerate(self.get_scheduled_range(days)):
+            status_map = checkins.get(keys[i], {})
+            absences, extras = apply_checkins(day_absences[i], status_map)
+            result.append((status_map, resolve_roster(roster, sched_status, absences, extras), sched_status))
+        return result
+
+    @timed("analyze_range")
+    def analyze_range(self, start_date, end_date, resolved_days=None):
+        """Runs the analyze_day rules for every date in [start_date, end_date] in one pass.
+
+        Returns one row per calendar day with count, openers, checkers, vet_screen,
+        overall_status and alerts. Closed days have status 'CLOSED', the closure
+        reason in msg, a count of 0 and no overall_status, as analyze_day reports them.
+        A caller that already has resolve_range() for those days can pass it as
+        resolved_days to skip resolving them again.
+        """
+        n_days = max((end_date - start_date).days + 1, 0)
+        days = [start_date + timedelta(days=i) for i in range(n_days)]
+        keys = [d.strftime("%Y-%m-%d") for d in days]
+        status, msg = [], []
+        skills = self.skills_index
+        staff_day, staff_caps, staff_vet = [], [], []
+        if resolved_days is None: resolved_days = self.resolve_range(days)
+        for i, (_, resolved, sched_status) in enumerate(resolved_days):
+            if resolved is None:
+                status.append('CLOSED'); msg.append(sched_status)
+                continue
+            status.append('OPEN'); msg.append('')
+            roster, active_staff, _, _ = resolved
+            for name in active_staff:
+                staff_day.append(i)
+                staff_caps.append(skills.get(name))
+                staff_vet.append('Vet Screening' in roster.get(name, ["Checked-In"]))
+
+        staff_day = np.asarray(staff_day, dtype='int64')
+        staff_caps = np.asarray(staff_caps, dtype='int64')
+        count = np.bincount(staff_day, minlength=n_days)
+        openers = np.bincount(staff_day, weights=(staff_caps & SKILL_OPENING) > 0, minlength=n_days).astype('int64')
+        checkers = np.bincount(staff_day, weights=(staff_caps & SKILL_SECOND_CHECK) > 0, minlength=n_days).astype('int64')
+        vet_screen = np.bincount(staff_day, weights=np.asarray(staff_vet, dtype=float), minlength=n_days) > 0
+
+        is_open = np.asarray(status, dtype=object) == 'OPEN'
+        short = count < 2
+        no_backup = count == 2
+        no_opener = openers < 1
+        few_checkers = checkers < 2
+        red = short | no_opener | few_checkers
+        overall = np.where(red, "RED", np.where(no_backup, "AMBER", "GREEN"))
+        alerts = []
+        for i in range(n_days):
+            if not is_open[i]:
+                alerts.append([])
+                continue
+            day_alerts = []
+            if short[i]: day_alerts.append(ALERT_SHORT_STAFFED)
+            elif no_backup[i]: day_alerts.append(ALERT_NO_BACKUP)
+            if no_opener[i]: day_alerts.append(ALERT_NO_OPENER)
+            if few_checkers[i]: day_alerts.append(ALERT_FEW_CHECKERS)
+            alerts.append(day_alerts)
+
+        return pd.DataFrame({
+            'Date': keys,
+            'Day': [d.strftime("%a") for d in days],
+            'status': status,
+            'msg': msg,
+            'count': count,
+            'openers': np.where(is_open, openers, 0),
+            'checkers': np.where(is_open, checkers, 0),
+            'vet_screen': vet_screen & is_open,
+            'overall_status': np.where(is_open, overall, None),
+            'alerts': alerts,
+        })
+
+    @timed("get_forecast")
+    def get_forecast(self, start_date, n_days):
+        """[(date, analyze_day result)] for n_days from start_date, reusing FORECAST_CACHE."""
+        days = [start_date + timedelta(days=i) for i in range(n_days)]
+        keys = [d.strftime("%Y-%m-%d") for d in days]
+        checkins = self.status_log.statuses_for(keys)
+        deps = []
+        for key, absences in zip(keys, self._absences_by_day(days, keys)):
+            row = self.schedule.get(key)
+            schedule = self.legacy_roster if row is None else tuple(str(v) for v in row.values())
+            deps.append((schedule, tuple(absences.items()), tuple(checkins.get(key, {}).items()), self.skills_index))
+        results = FORECAST_CACHE.results(self.storage.key, keys, deps, lambda i: self.analyze_day(days[i]))
+        return list(zip(days, results))
+
+    def get_weekly_forecast(self, start_date, n_days=5):
+        """Staff count and RED/AMBER/GREEN (GRAY when closed) for the weekdays in the next n_days."""
+        data = []
+        for d, result in self.get_forecast(start_date, n_days):
+            if d.weekday() > 4: continue
+            closed = result.get('status') == 'CLOSED'
+            data.append({"Date": d.strftime("%Y-%m-%d"), "Day": d.strftime("%a"), "Staff Count": result['count'],
+                         "Status": 'GRAY' if closed else result['overall_status']})
+        return pd.DataFrame(data, columns=["Date", "Day", "Staff Count", "Status"])
+
+    def leave_impact(self, name, start_date, end_date):
+        """What booking name off for [start_date, end_date] would do to each open day they're working.
+
+        Takes each day's analyze_day result from get_forecast (usually already in
+        FORECAST_CACHE) and takes the one person off it, applying the same rules to
+        what's left. Returns a DataFrame with LEAVE_IMPACT_COLUMNS.
+        """
+        caps = self.skills_index.get(name)
+        forecast = self.get_forecast(start_date, max((end_date - start_date).days + 1, 0))
+        checkins = self.status_log.statuses_for([d.strftime("%Y-%m-%d") for d, _ in forecast])
+        rows = []
+        for d, result in forecast:
+            if result.get('status') == 'CLOSED': continue
+            # A Present check-in outranks booked leave, as in apply_checkins
+            if checkins.get(d.strftime("%Y-%m-%d"), {}).get(name) == 'Present': continue
+            if not any(s['Name'] == name for s in result['staff_details']): continue
+            count = result['count'] - 1
+            alerts, status = staffing_alerts(count, result['openers'] - bool(caps & SKILL_OPENING),
+                                             result['checkers'] - bool(caps & SKILL_SECOND_CHECK))
+            rows.append({"Date": d.strftime("%Y-%m-%d"), "Day": d.strftime("%a"), "Before": result['overall_status'],
+                         "After": status, "Staff": count, "Alerts": " | ".join(alerts)})
+        return pd.DataFrame(rows, columns=LEAVE_IMPACT_COLUMNS)
+
+    def save_checkin(self, date_obj, name, status, note):
+        before = self._before_save()
+        self.storage.append_checkin({'Date': date_obj.strftime("%Y-%m-%d"), 'Name': name, 'Status': status, 'Note': note, 'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        self._record(before, 'checkin', date_obj.strftime("%Y-%m-%d"))
+        
+    def save_holiday(self, name, start_date, end_date, type, note):
+        new_row = {
+            "Name": name,
+            "Request Date": datetime.now().strftime("%Y-%m-%d"),
+            "Absence Start": start_date.strftime("%Y-%m-%d"),
+            "Absence End": end_date.strftime("%Y-%m-%d"),
+            "Type": type,
+            "Status": "Approved",
+            "Notes": note
+        }
+        before = self._before_save()
+        df = self.storage.append_holiday(new_row)
+        df.columns = [str(c).strip() for c in df.columns]
+        self.data['holidays'] = df
+        self.absence_index = self.absence_index.with_booking(name, new_row["Absence Start"], new_row["Absence End"], type, new_row["Status"])
+        self._record(before, 'holiday', new_row["Absence Start"], new_row["Absence End"])
+
+    def save_simple_schedule(self, date_obj, opener, downstairs, upstairs, vet):
+        new_row = {
+            "Date": date_obj.strftime("%Y-%m-%d"),
+            "Opener": ", ".join(opener),
+            "Downstairs": ", ".join(downstairs),
+            "Upstairs": ", ".join(upstairs),
+            "Vet Screening": ", ".join(vet)
+        }
+        before = self._before_save()
+        self.schedule.upsert(new_row)
+        self.data['simple_schedule'] = self.schedule.frame()
+        self._record(before, 'schedule', new_row["Date"])
+
+    def save_skills(self, df):
+        before = self._before_save()
+        self.storage.save_skills(df)
+        self.data['skills'] = df
+        self.skills_index = SkillsIndex(df)
+        self._record(before, 'skills')
+
+    def _before_save(self):
+        """The data set's fingerprint ahead of a save, for the status table (None when it's off)."""
+        return self.storage.fingerprint() if self.status_table is not None else None
+
+    def _record(self, before, kind, start=None, end=None):
+        if self.status_table is not None:
+            self.status_table.record(self, kind, start, end, before)
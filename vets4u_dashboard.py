@@ -1,3 +1,10 @@
+# Engine first: the real pandas import below replaces its lazy stand-in
+from vets4u_core import *
+from vets4u_branches import load_branches, rollup
+from vets4u_rota import generate_rota, save_rota
+from vets4u_analytics import attendance_rollups
+from vets4u_risk import simulate_risk
+from vets4u_reports import FORMATS, PERIODS, export_zip, local_branch
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -14,15 +21,15 @@ except ImportError:
     print("    pip install streamlit")
     sys.exit(1)
 
-# Files
-STATUS_FILE = "vets4u_daily_status.csv"
-SIMPLE_SCHEDULE_FILE = "vets4u_simple_schedule.csv"
-
 # --- SECURITY CONFIG ---
 # Switched to plain text to resolve login issues.
 # Re-enable hashing later if needed.
 PASSWORD = "vets4upomeroy1"
 
+# Seconds between Live Dashboard refreshes when auto-refresh is on. Off by default, as every
+# refresh re-renders the tab; set this (e.g. 5 on a wall display) to turn it on at start-up
+AUTO_REFRESH_SECONDS = float(os.environ.get("VETS4U_AUTO_REFRESH_SECONDS", "0"))
+
 def check_password():
     """Returns True if the user has entered the correct password."""
     if st.session_state.get('password_correct', False):
@@ -56,310 +63,94 @@ def get_daily_quote():
     day_of_year = datetime.now().timetuple().tm_yday
     return quotes[day_of_year % len(quotes)]
 
-class Vets4uDashboard:
-    def __init__(self):
-        self.files = {
-            'schedule': "vets4u Tracker.xlsx - 4-Week Schedule.csv",
-            'skills': "vets4u Tracker.xlsx - Skills Matrix.csv",
-            'staff': "vets4u Tracker.xlsx - Staff Directory.csv",
-            'holidays': "vets4u Tracker.xlsx - Holiday Tracker.csv"
-        }
-        self.data = {}
-        self.using_demo_data = False
-        self.ensure_data_loaded()
-
-    def ensure_data_loaded(self):
-        """Loads data. If files missing, creates templates."""
-        if not os.path.exists(self.files['skills']):
-            self.using_demo_data = True
-            default_staff = [
-                {"Name": "Dipesh", "Opening": "YES", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
-                {"Name": "Nidhesh", "Opening": "YES", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
-                {"Name": "Varsha", "Opening": "NO", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
-                {"Name": "VJ", "Opening": "NO", "Dispensing": "YES", "Second Check": "YES", "Vet Screening": "NO"},
-                {"Name": "Rushil", "Opening": "NO", "Dispensing": "NO", "Second Check": "NO", "Vet Screening": "NO"},
-                {"Name": "Rak", "Opening": "YES", "Dispensing": "NO", "Second Check": "NO", "Vet Screening": "NO"}
-            ]
-            pd.DataFrame(default_staff).to_csv(self.files['skills'], index=False)
-        
-        try:
-            try:
-                raw_skills = pd.read_csv(self.files['skills'], header=None, names=range(20))
-                header_mask = raw_skills.apply(lambda x: x.astype(str).str.contains('Name', case=False).any() and 
-                                                         x.astype(str).str.contains('Opening', case=False).any(), axis=1)
-                if header_mask.any():
-                    header_idx = header_mask.idxmax()
-                    self.data['skills'] = pd.read_csv(self.files['skills'], header=header_idx)
-                else:
-                    self.data['skills'] = pd.read_csv(self.files['skills'])
-            except:
-                 self.data['skills'] = pd.read_csv(self.files['skills'])
-
-            if 'Name' in self.data['skills'].columns:
-                self.data['skills']['Name'] = self.data['skills']['Name'].astype(str).str.strip()
-                self.data['skills'].set_index('Name', inplace=True)
-            
-            if not os.path.exists(self.files['holidays']):
-                 pd.DataFrame(columns=["Name", "Request Date", "Absence Start", "Absence End", "Type", "Status"]).to_csv(self.files['holidays'], index=False)
-            
-            try:
-                raw_holidays = pd.read_csv(self.files['holidays'], header=None, names=range(10))
-                h_header_mask = raw_holidays.apply(lambda x: x.astype(str).str.contains('Absence Start', case=False).any(), axis=1)
-                if h_header_mask.any():
-                    h_idx = h_header_mask.idxmax()
-                    self.data['holidays'] = pd.read_csv(self.files['holidays'], header=h_idx)
-                else:
-                    self.data['holidays'] = pd.read_csv(self.files['holidays'])
-            except:
-                self.data['holidays'] = pd.read_csv(self.files['holidays'])
-
-            if os.path.exists(SIMPLE_SCHEDULE_FILE):
-                self.data['simple_schedule'] = pd.read_csv(SIMPLE_SCHEDULE_FILE)
-            else:
-                self.data['simple_schedule'] = pd.DataFrame(columns=["Date", "Opener", "Downstairs", "Upstairs", "Vet Screening"])
-
-            if os.path.exists(self.files['schedule']):
-                self.data['legacy_schedule'] = pd.read_csv(self.files['schedule'], header=None, names=range(20))
-            else:
-                self.data['legacy_schedule'] = None
-
-            return True
-
-        except Exception as e:
-            st.error(f"❌ Error loading data: {e}")
-            return False
-
-    def get_scheduled_staff(self, query_date):
-        q_date_str = query_date.strftime("%Y-%m-%d")
-        
-        df_simple = self.data.get('simple_schedule')
-        if df_simple is not None and not df_simple.empty:
-            day_row = df_simple[df_simple['Date'] == q_date_str]
-            if not day_row.empty:
-                row = day_row.iloc[0]
-                roster = {}
-                for role in ['Opener', 'Downstairs', 'Upstairs', 'Vet Screening']:
-                    if role in row and pd.notna(row[role]):
-                        names = [n.strip() for n in str(row[role]).split(',')]
-                        for n in names:
-                            if n not in roster: roster[n] = []
-                            roster[n].append(role)
-                return roster, "Open"
-
-        df_legacy = self.data.get('legacy_schedule')
-        if df_legacy is None or df_legacy.empty:
-            return {}, "No Schedule Data"
-
-        start_row = 5 
-        for idx, row in df_legacy.iterrows():
-            row_str = str(row.values)
-            if "WEEK" in row_str and "CONFIRMED" in row_str:
-                start_row = idx
-                break
-        
-        day_idx = query_date.weekday()
-        if day_idx > 4: return {}, "Weekend - Closed"
-        col_map = {0: 1, 1: 2, 2: 3, 3: 4, 4: 5}
-        col_idx = col_map[day_idx]
-        
-        if start_row + 5 >= len(df_legacy): return {}, "Schedule Data Error"
-
-        roles_raw = {
-            'Opener': df_legacy.iloc[start_row + 2, col_idx],
-            'Downstairs': df_legacy.iloc[start_row + 3, col_idx],
-            'Upstairs': df_legacy.iloc[start_row + 4, col_idx],
-            'Vet Screening': df_legacy.iloc[start_row + 5, col_idx]
-        }
-        
-        roster = {}
-        for role, raw_names in roles_raw.items():
-            if pd.isna(raw_names) or str(raw_names).lower() == 'nan': continue
-            names = [n.strip() for n in str(raw_names).replace('+', ',').replace('/', ',').split(',')]
-            for name in names:
-                if name not in roster: roster[name] = []
-                roster[name].append(role)
-        
-        return roster, "Open"
-
-    def get_status_updates(self, date_obj):
-        check_date = date_obj.strftime("%Y-%m-%d")
-        absent_staff = {}
-        extras = set()
-        
-        df_h = self.data['holidays']
-        df_h.columns = [str(c).strip() for c in df_h.columns]
+def live_result(storage, date_obj, open_app):
+    """The day's analyze_day result, kept in the session and only recomputed when
+    the data files (or the date) change, so an idle refresh costs a few stat calls."""
+    version = (storage.key, date_obj, repr(storage.fingerprint()))
+    cached = st.session_state.get('live_result')
+    if cached is None or cached[0] != version:
+        PERF.count('live dashboard recomputes')
+        cached = (version, open_app().analyze_day(date_obj))
+        st.session_state['live_result'] = cached
+    return cached[1]
+
+def render_live_dashboard(storage, open_app):
+    """Tab 1. Runs as a fragment when auto-refresh is on, so only this tab re-renders."""
+    selected_date = datetime.now()
+    date_obj = datetime.combine(selected_date, datetime.min.time())
+    st.markdown(f"### 📅 Status for {selected_date.strftime('%A %d %B %Y')}")
+    result = live_result(storage, date_obj, open_app)
+    
+    if result.get('status') == 'CLOSED':
+        st.info("ℹ️ Store is CLOSED today (or no schedule set).")
+    else:
+        # 1. STATUS BANNER
+        status = result['overall_status']
+        if status == "RED": 
+            st.error(f"🛑 **CRITICAL STATUS** - {len(result['sick_details'])} Absent - ACTION REQUIRED")
+        elif status == "AMBER": 
+            st.warning(f"⚠️ **WARNING LEVEL** - Operating on Minimum Staff")
+        else: 
+            st.success(f"✅ **OPERATIONAL** - All Systems Normal")
+
+        # 2. KEY METRICS GRID
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("👥 Team On-Site", result['count'], "Target: 3")
+        m2.metric("🔑 Openers", result['openers'], "Min: 1")
+        m3.metric("💊 Checkers", result['checkers'], "Min: 2")
+        m4.metric("⚠️ Issues", len(result['sick_details']) + len(result['late_details']), "Alerts", delta_color="inverse")
+
+        st.divider()
         
-        if 'Absence Start' in df_h.columns and 'Absence End' in df_h.columns:
-            for _, row in df_h.iterrows():
-                try:
-                    start = pd.to_datetime(row.get('Absence Start'))
-                    end = pd.to_datetime(row.get('Absence End'))
-                    current = pd.to_datetime(check_date)
-                    
-                    if str(row.get('Status')) == 'Approved' and start <= current <= end:
-                        absent_staff[row['Name']] = row['Type']
-                except:
-                    continue
-
-        if os.path.exists(STATUS_FILE):
-            df_s = pd.read_csv(STATUS_FILE)
-            df_s = df_s[df_s['Date'] == check_date]
+        # 3. TOMORROW'S OPENER
+        next_day = date_obj + timedelta(days=1)
+        if next_day.weekday() > 4: # Sat/Sun
+            next_day += timedelta(days=(7 - next_day.weekday()))
             
-            status_map = {}
-            for _, row in df_s.iterrows():
-                status_map[row['Name']] = row['Status']
-            
-            for name, status in status_map.items():
-                if status in ['Sick', 'Holiday', 'Late', 'Absent']:
-                    absent_staff[name] = f"Reported: {status}"
-                    if name in extras: extras.remove(name)
-                elif status == 'Present':
-                    if name in absent_staff: del absent_staff[name]
-                    extras.add(name)
+        # Rule: Dipesh on Thursday, Nidhesh on other days
+        if next_day.weekday() == 3: # Thursday
+            opener_name = "Dipesh"
+        else:
+            opener_name = "Nidhesh"
         
-        return absent_staff, list(extras)
-
-    def analyze_day(self, date_obj):
-        roster, status = self.get_scheduled_staff(date_obj)
-        absences, extras = self.get_status_updates(date_obj)
-
-        if status != "Open": 
-            if extras:
-                status = "Open"
-                roster = {}
-            else:
-                return {'status': 'CLOSED', 'msg': status, 'count': 0}
+        st.info(f"🔑 **Next Opening Shift ({next_day.strftime('%A')}):** {opener_name}")
 
-        for name in extras:
-            if name not in roster:
-                roster[name] = ["Flexible / Checked-In"]
-
-        active_staff = []
-        late_staff = []
-        sick_staff = []
-        
-        all_names = set(list(roster.keys()) + list(absences.keys()))
+        # 4. MAIN TEAM BOARD
+        c_present, c_late, c_absent = st.columns(3)
         
-        for name in all_names:
-            if name in absences:
-                reason = absences[name]
-                if "Late" in reason:
-                    late_staff.append({'Name': name, 'Reason': reason, 'Role': ', '.join(roster.get(name, ['Unassigned']))})
+        with c_present:
+            with st.container(border=True):
+                st.markdown("### 🟢 Active Team")
+                if result['staff_details']:
+                    for s in result['staff_details']:
+                        st.success(f"**{s['Name']}**")
+                        st.caption(f"{s['Role']}")
                 else:
-                    sick_staff.append({'Name': name, 'Reason': reason})
-            elif name in roster:
-                active_staff.append(name)
-        
-        metrics = {
-            'count': len(active_staff), 
-            'openers': 0, 
-            'checkers': 0, 
-            'vet_screen': False, 
-            'staff_details': [], 
-            'late_details': late_staff,
-            'sick_details': sick_staff
-        }
-        
-        skills_df = self.data['skills']
-        
-        for name in active_staff:
-            match = skills_df[skills_df.index.str.lower() == name.lower()]
-            can_open, can_check = False, False
-            if not match.empty:
-                s = match.iloc[0]
-                can_open = str(s.get('Opening', 'NO')).upper() == 'YES'
-                can_check = str(s.get('Second Check', 'NO')).upper() == 'YES'
-                if can_open: metrics['openers'] += 1
-                if can_check: metrics['checkers'] += 1
-            
-            roles = roster.get(name, ["Checked-In"])
-            if 'Vet Screening' in roles: metrics['vet_screen'] = True
-            
-            metrics['staff_details'].append({
-                'Name': name, 
-                'Role': ', '.join(roles), 
-                'Skills': f"{'🔑' if can_open else ''}{'💊' if can_check else ''}"
-            })
-
-        alerts = []
-        overall_status = "GREEN"
-        if metrics['count'] < 2:
-            alerts.append("CRITICAL: Staff count < 2. CLOSE PHARMACY.")
-            overall_status = "RED"
-        elif metrics['count'] == 2:
-            alerts.append("WARNING: No Backup.")
-            if overall_status != "RED": overall_status = "AMBER"
-        if metrics['openers'] < 1:
-            alerts.append("CRITICAL: No Opener.")
-            overall_status = "RED"
-        if metrics['checkers'] < 2: 
-            alerts.append("CRITICAL: Dispensing Halted (<2 Checkers).")
-            overall_status = "RED"
-            
-        metrics['alerts'] = alerts
-        metrics['overall_status'] = overall_status
-        return metrics
-
-    def get_weekly_forecast(self, start_date):
-        data = []
-        for i in range(5):
-            d = start_date + timedelta(days=i)
-            if d.weekday() > 4: continue
-            res = self.analyze_day(d)
-            data.append({"Date": d.strftime("%Y-%m-%d"), "Day": d.strftime("%a"), "Staff Count": res.get('count', 0), "Status": res.get('overall_status', 'GRAY')})
-        return pd.DataFrame(data)
-
-    def save_checkin(self, date_obj, name, status, note):
-        new_row = pd.DataFrame([{'Date': date_obj.strftime("%Y-%m-%d"), 'Name': name, 'Status': status, 'Note': note, 'Timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")}])
-        if not os.path.exists(STATUS_FILE): new_row.to_csv(STATUS_FILE, index=False)
-        else: new_row.to_csv(STATUS_FILE, mode='a', header=False, index=False)
+                    st.write("Waiting for staff...")
         
-    def save_holiday(self, name, start_date, end_date, type, note):
-        new_row = {
-            "Name": name,
-            "Request Date": datetime.now().strftime("%Y-%m-%d"),
-            "Absence Start": start_date.strftime("%Y-%m-%d"),
-            "Absence End": end_date.strftime("%Y-%m-%d"),
-            "Type": type,
-            "Status": "Approved",
-            "Notes": note
-        }
-        
-        if os.path.exists(self.files['holidays']):
-            try:
-                df = pd.read_csv(self.files['holidays'])
-            except:
-                df = pd.DataFrame(columns=["Name", "Request Date", "Absence Start", "Absence End", "Type", "Status", "Notes"])
-        else:
-            df = pd.DataFrame(columns=["Name", "Request Date", "Absence Start", "Absence End", "Type", "Status", "Notes"])
-            
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        df.to_csv(self.files['holidays'], index=False)
-        self.data['holidays'] = df
-
-    def save_simple_schedule(self, date_obj, opener, downstairs, upstairs, vet):
-        if os.path.exists(SIMPLE_SCHEDULE_FILE):
-            df = pd.read_csv(SIMPLE_SCHEDULE_FILE)
-        else:
-            df = pd.DataFrame(columns=["Date", "Opener", "Downstairs", "Upstairs", "Vet Screening"])
-        
-        date_str = date_obj.strftime("%Y-%m-%d")
-        df = df[df['Date'] != date_str]
-        
-        new_row = {
-            "Date": date_str,
-            "Opener": ", ".join(opener),
-            "Downstairs": ", ".join(downstairs),
-            "Upstairs": ", ".join(upstairs),
-            "Vet Screening": ", ".join(vet)
-        }
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        df.to_csv(SIMPLE_SCHEDULE_FILE, index=False)
-        self.data['simple_schedule'] = df
-
-    def save_skills(self, df):
-        df.to_csv(self.files['skills'])
-        self.data['skills'] = df
+        with c_late:
+            with st.container(border=True):
+                st.markdown("### 🟠 Late / Issues")
+                if result['late_details']:
+                    for l in result['late_details']:
+                        st.warning(f"**{l['Name']}**")
+                        st.caption(f"Reason: {l['Reason']}")
+                else:
+                    st.markdown("✅ *No delays*")
+
+        with c_absent:
+            with st.container(border=True):
+                st.markdown("### 🔴 Absent / Off")
+                if result['sick_details']:
+                    for m in result['sick_details']:
+                        st.error(f"**{m['Name']}**")
+                        st.caption(f"{m['Reason']}")
+                else:
+                    st.markdown("✅ *Full attendance*")
+                    
+        # 5. DAILY QUOTE (Footer)
+        st.markdown("---")
+        st.markdown(f"<div style='text-align: center; color: #888;'><i>✨ {get_daily_quote()}</i></div>", unsafe_allow_html=True)
 
 # --- Streamlit UI ---
 def main():
@@ -438,102 +229,49 @@ def main():
     if not check_password():
         st.stop()
     
-    app = Vets4uDashboard()
+    PERF.reset()
+    branches = load_branches()
+    branch = None
+    if branches:
+        branch_names = [b.name for b in branches]
+        branch = branches[branch_names.index(st.sidebar.selectbox("🏪 Branch", branch_names))]
+    auto_refresh = st.sidebar.toggle("🔄 Auto-refresh Live Dashboard", value=AUTO_REFRESH_SECONDS > 0,
+                                     help="Re-renders the Live Dashboard every few seconds to show new check-ins and schedule changes, without reloading the other tabs")
+
+    with PERF.timer("load: Vets4uDashboard()"):
+        app = branch.open() if branch else Vets4uDashboard()
+    if app.load_error is not None:
+        st.error(f"❌ Error loading data: {app.load_error}")
     
     col_logo, col_title, col_weather = st.columns([1, 4, 1])
     with col_logo:
         st.markdown("# 💊")
     with col_title:
         st.title("Vets4u Command Center")
-        st.caption(f"Logged in as Admin • {datetime.now().strftime('%H:%M')} • Leicester, UK")
+        st.caption(f"Logged in as Admin • {datetime.now().strftime('%H:%M')} • {branch.name if branch else 'Leicester'}, UK")
     with col_weather:
         # REMOVED WEATHER - ADDED PLACEHOLDER FOR NOW
         # Or just kept blank to align columns
         pass
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏠 Live Dashboard", "✅ Check-In", "📅 Forecast", "👥 Staff Manager", "🗓️ Schedule Builder"])
+    tab_labels = ["🏠 Live Dashboard", "✅ Check-In", "📅 Forecast", "👥 Staff Manager", "🗓️ Schedule Builder", "📊 Attendance"]
+    if branches: tab_labels.append("🏪 All Branches")
+    tabs = st.tabs(tab_labels)
+    tab1, tab2, tab3, tab4, tab5, tab6 = tabs[:6]
 
     selected_date = datetime.now()
     date_obj = datetime.combine(selected_date, datetime.min.time())
 
     # --- TAB 1: LIVE DASHBOARD ---
-    with tab1:
-        st.markdown(f"### 📅 Status for {selected_date.strftime('%A %d %B %Y')}")
-        result = app.analyze_day(date_obj)
-        
-        if result.get('status') == 'CLOSED':
-            st.info("ℹ️ Store is CLOSED today (or no schedule set).")
+    with tab1, PERF.timer("render: Live Dashboard"):
+        open_app = (lambda: branch.open()) if branch else Vets4uDashboard
+        if auto_refresh:
+            st.fragment(run_every=AUTO_REFRESH_SECONDS or 5)(render_live_dashboard)(app.storage, open_app)
         else:
-            # 1. STATUS BANNER
-            status = result['overall_status']
-            if status == "RED": 
-                st.error(f"🛑 **CRITICAL STATUS** - {len(result['sick_details'])} Absent - ACTION REQUIRED")
-            elif status == "AMBER": 
-                st.warning(f"⚠️ **WARNING LEVEL** - Operating on Minimum Staff")
-            else: 
-                st.success(f"✅ **OPERATIONAL** - All Systems Normal")
-
-            # 2. KEY METRICS GRID
-            m1, m2, m3, m4 = st.columns(4)
-            m1.metric("👥 Team On-Site", result['count'], "Target: 3")
-            m2.metric("🔑 Openers", result['openers'], "Min: 1")
-            m3.metric("💊 Checkers", result['checkers'], "Min: 2")
-            m4.metric("⚠️ Issues", len(result['sick_details']) + len(result['late_details']), "Alerts", delta_color="inverse")
-
-            st.divider()
-            
-            # 3. TOMORROW'S OPENER
-            next_day = date_obj + timedelta(days=1)
-            if next_day.weekday() > 4: # Sat/Sun
-                next_day += timedelta(days=(7 - next_day.weekday()))
-                
-            # Rule: Dipesh on Thursday, Nidhesh on other days
-            if next_day.weekday() == 3: # Thursday
-                opener_name = "Dipesh"
-            else:
-                opener_name = "Nidhesh"
-            
-            st.info(f"🔑 **Next Opening Shift ({next_day.strftime('%A')}):** {opener_name}")
-
-            # 4. MAIN TEAM BOARD
-            c_present, c_late, c_absent = st.columns(3)
-            
-            with c_present:
-                with st.container(border=True):
-                    st.markdown("### 🟢 Active Team")
-                    if result['staff_details']:
-                        for s in result['staff_details']:
-                            st.success(f"**{s['Name']}**")
-                            st.caption(f"{s['Role']}")
-                    else:
-                        st.write("Waiting for staff...")
-            
-            with c_late:
-                with st.container(border=True):
-                    st.markdown("### 🟠 Late / Issues")
-                    if result['late_details']:
-                        for l in result['late_details']:
-                            st.warning(f"**{l['Name']}**")
-                            st.caption(f"Reason: {l['Reason']}")
-                    else:
-                        st.markdown("✅ *No delays*")
-
-            with c_absent:
-                with st.container(border=True):
-                    st.markdown("### 🔴 Absent / Off")
-                    if result['sick_details']:
-                        for m in result['sick_details']:
-                            st.error(f"**{m['Name']}**")
-                            st.caption(f"{m['Reason']}")
-                    else:
-                        st.markdown("✅ *Full attendance*")
-                        
-            # 5. DAILY QUOTE (Footer)
-            st.markdown("---")
-            st.markdown(f"<div style='text-align: center; color: #888;'><i>✨ {get_daily_quote()}</i></div>", unsafe_allow_html=True)
+            render_live_dashboard(app.storage, lambda: app)
 
     # --- TAB 2: CHECK-IN & HOLIDAY ---
-    with tab2:
+    with tab2, PERF.timer("render: Check-In"):
         staff_list = app.data['skills'].index.tolist() if 'skills' in app.data else []
         
         c1, c2 = st.columns(2)
@@ -551,11 +289,24 @@ def main():
         
         with c2:
             st.warning("✈️ **Book Future Leave**")
+            # Name and dates sit outside the form so the cover preview updates as they change
+            h_name = st.selectbox("👤 Name", staff_list, key="h_name")
+            d1, d2 = st.columns(2)
+            h_start = d1.date_input("📅 Start Date", key="h_start")
+            h_end = d2.date_input("📅 End Date", key="h_end")
+            if h_end < h_start:
+                st.warning("End date is before the start date.")
+            elif h_name:
+                impact = app.leave_impact(h_name, datetime.combine(h_start, datetime.min.time()),
+                                          datetime.combine(h_end, datetime.min.time()))
+                # Only days the booking itself changes; a day already short stays as it was
+                at_risk = impact[impact['After'] != impact['Before']]
+                if len(at_risk):
+                    st.error(f"⚠️ {len(at_risk)} day(s) would drop to AMBER or RED without {h_name}")
+                    st.dataframe(at_risk, hide_index=True, use_container_width=True)
+                else:
+                    st.success(f"✅ Cover is unchanged on the {len(impact)} working day(s) {h_name} would miss")
             with st.form("holiday_plan"):
-                h_name = st.selectbox("👤 Name", staff_list, key="h_name")
-                d1, d2 = st.columns(2)
-                h_start = d1.date_input("📅 Start Date")
-                h_end = d2.date_input("📅 End Date")
                 h_type = st.selectbox("🏷 Type", ["Holiday", "Sick (Planned)", "Training"])
                 h_note = st.text_input("📝 Reason")
                 if st.form_submit_button("Book Holiday"):
@@ -564,20 +315,37 @@ def main():
                     st.rerun()
 
     # --- TAB 3: FORECAST ---
-    with tab3:
-        st.write("#### 🔮 7-Day Staffing Outlook")
-        forecast_df = app.get_weekly_forecast(date_obj)
+    with tab3, PERF.timer("render: Forecast"):
+        horizons = {"This Week": 5, "2 Weeks": 14, "Month": 31, "Quarter": 91}
+        horizon = st.selectbox("Horizon", list(horizons), key="forecast_horizon")
+        st.write(f"#### 🔮 {horizon} Staffing Outlook")
+        forecast_df = app.get_weekly_forecast(date_obj, horizons[horizon])
         
         day_of_week = datetime.now().weekday()
         progress = (day_of_week + 1) / 5
         if progress > 1: progress = 1.0
         st.progress(progress, text=f"Week Progress: {int(progress*100)}%")
         
-        st.bar_chart(forecast_df.set_index("Day")['Staff Count'], color="#00CC96")
+        if horizons[horizon] > 5:
+            c1, c2 = st.columns(2)
+            c1.metric("🔴 Red Days", int((forecast_df['Status'] == "RED").sum()))
+            c2.metric("🟠 Amber Days", int((forecast_df['Status'] == "AMBER").sum()))
+        st.bar_chart(forecast_df.set_index("Date" if horizons[horizon] > 5 else "Day")['Staff Count'], color="#00CC96")
         st.dataframe(forecast_df, use_container_width=True, hide_index=True)
 
+        with st.expander("🎲 Sick & Late Risk"):
+            st.caption("Chance of each alert once people call in sick or late, from 10,000 simulated days using everyone's check-in history.")
+            if st.toggle("Run simulation", key="risk_on"):
+                risk_df = simulate_risk(app, date_obj, horizons[horizon], scenarios=10000, seed=0)
+                open_days = risk_df[risk_df['Status'] == 'OPEN']
+                r1, r2 = st.columns(2)
+                r1.metric("🎲 Likely RED Days (>50%)", int((open_days['P(RED)'] > 0.5).sum()))
+                r2.metric("📈 Highest Daily Risk", f"{open_days['P(RED)'].max():.0%}" if len(open_days) else "-")
+                st.bar_chart(risk_df.set_index("Date")['P(RED)'], color="#EF553B")
+                st.dataframe(risk_df, use_container_width=True, hide_index=True)
+
     # --- TAB 4: STAFF MANAGER ---
-    with tab4:
+    with tab4, PERF.timer("render: Staff Manager"):
         st.header("👥 Staff Manager")
         st.write("Add new staff or update skills here.")
         
@@ -597,7 +365,7 @@ def main():
                 st.rerun()
 
     # --- TAB 5: SCHEDULE BUILDER ---
-    with tab5:
+    with tab5, PERF.timer("render: Schedule Builder"):
         st.header("🗓️ Schedule Builder")
         st.write("Set the rota for future dates.")
         
@@ -619,9 +387,114 @@ def main():
             st.success(f"Schedule saved for {sch_date}")
             st.rerun()
 
+        with st.expander("🤖 Auto-Generate Rota"):
+            st.caption("Fills weekdays from the Skills Matrix, skipping approved leave and dates already scheduled.")
+            g1, g2, g3 = st.columns(3)
+            rota_start = g1.date_input("From", datetime.now() + timedelta(days=1), key="rota_start")
+            rota_end = g2.date_input("To", datetime.now() + timedelta(days=28), key="rota_end")
+            per_day = g3.number_input("Staff per day", min_value=2, max_value=max(2, len(staff_list)), value=min(4, max(2, len(staff_list))))
+            overwrite = st.checkbox("Replace dates that already have a schedule")
+            if st.button("🤖 Generate Rota"):
+                st.session_state['rota_preview'] = generate_rota(app, datetime.combine(rota_start, datetime.min.time()),
+                                                                 datetime.combine(rota_end, datetime.min.time()),
+                                                                 staff_per_day=int(per_day), overwrite=overwrite)
+            rota = st.session_state.get('rota_preview')
+            if rota is not None:
+                if rota.empty:
+                    st.info("No unscheduled weekdays in that range.")
+                else:
+                    st.dataframe(rota, hide_index=True, use_container_width=True)
+                    if st.button("💾 Save Rota", type="primary"):
+                        n = save_rota(app, rota)
+                        del st.session_state['rota_preview']
+                        st.success(f"Saved the rota for {n} days")
+                        st.rerun()
+
         if 'simple_schedule' in app.data and not app.data['simple_schedule'].empty:
             st.markdown("### 📋 Existing Schedule Data")
             st.dataframe(app.data['simple_schedule'], hide_index=True, use_container_width=True)
 
+    # --- TAB 6: ATTENDANCE ---
+    with tab6, PERF.timer("render: Attendance"):
+        st.header("📊 Attendance")
+        rollups = attendance_rollups(app.storage)
+        months = rollups.months()
+        if not months:
+            st.info("No check-ins recorded yet.")
+        else:
+            periods = {"Last 3 Months": 3, "Last 6 Months": 6, "Last 12 Months": 12, "All Time": None}
+            period = st.selectbox("Period", list(periods), index=2, key="attendance_period")
+            since = months[-periods[period]] if periods[period] and len(months) > periods[period] else None
+
+            people = rollups.by_person(since)
+            trend = rollups.by_month(since)
+            totals = trend[["Present", "Late", "Sick", "Absent"]].sum()
+            attended = totals["Present"] + totals["Late"]
+            a1, a2, a3 = st.columns(3)
+            a1.metric("⏰ Lateness Rate", f"{100 * totals['Late'] / attended:.1f}%" if attended else "–")
+            a2.metric("🤒 Sick Days", int(totals["Sick"]))
+            a3.metric("❌ Absences", int(totals["Absent"]))
+
+            st.write("#### 📈 Month by Month")
+            st.line_chart(trend[["Lateness %", "Sick %"]])
+            st.dataframe(trend, use_container_width=True)
+
+            st.write("#### 📆 By Day of Week")
+            st.bar_chart(rollups.by_weekday(since)[["Late", "Sick", "Absent"]])
+
+            st.write("#### 👤 By Person")
+            st.dataframe(people, use_container_width=True)
+
+        with st.expander("📤 Export Reports"):
+            st.caption("Day-by-day status, absences and lateness for each week or month, as CSV, HTML or Excel.")
+            e1, e2, e3 = st.columns(3)
+            report_period = e1.selectbox("Report per", PERIODS, format_func=str.title, key="report_period")
+            report_start = e2.date_input("From", date_obj.replace(month=1, day=1), key="report_start")
+            report_end = e3.date_input("To", date_obj, key="report_end")
+            report_formats = st.multiselect("Formats", list(FORMATS), default=["xlsx"], key="report_formats")
+            all_branches = bool(branches) and st.checkbox("All branches", key="report_all_branches")
+            if st.button("📤 Build Reports", disabled=not report_formats or report_end < report_start):
+                with st.spinner("Building reports..."):
+                    data, errors = export_zip(branches if all_branches else [branch or local_branch()],
+                                              datetime.combine(report_start, datetime.min.time()),
+                                              datetime.combine(report_end, datetime.min.time()), report_period, report_formats)
+                st.session_state['report_zip'] = (f"vets4u_{report_period}_{report_start:%Y%m%d}-{report_end:%Y%m%d}.zip", data)
+                for name, error in errors.items():
+                    st.error(f"❌ {name}: {error}")
+            report = st.session_state.get('report_zip')
+            if report is not None:
+                st.download_button("⬇️ Download Reports", report[1], file_name=report[0], mime="application/zip")
+
+    # --- TAB 7: ALL BRANCHES (multi-branch mode only) ---
+    if branches:
+        with tabs[6], PERF.timer("render: All Branches"):
+            st.header("🏪 All Branches")
+            st.write(f"Staffing status for {selected_date.strftime('%A %d %B %Y')} across {len(branches)} branches.")
+            rollup_df = rollup(branches, date_obj)
+
+            r1, r2, r3 = st.columns(3)
+            r1.metric("🛑 RED", int((rollup_df['Status'] == "RED").sum()))
+            r2.metric("⚠️ AMBER", int((rollup_df['Status'] == "AMBER").sum()))
+            r3.metric("✅ GREEN", int((rollup_df['Status'] == "GREEN").sum()))
+            st.dataframe(rollup_df, hide_index=True, use_container_width=True)
+
+    render_diagnostics()
+
+def render_diagnostics():
+    """Admin-only panel with this rerun's timings; shown when VETS4U_PERF=1."""
+    if not PERF.enabled:
+        return
+    snap = PERF.snapshot()
+    with st.sidebar.expander("🩺 Diagnostics", expanded=False):
+        st.caption(f"Rerun started {snap['started']}")
+        timers = pd.DataFrame([{'Section': k, **v} for k, v in snap['timers'].items()])
+        if not timers.empty:
+            st.dataframe(timers.sort_values('total_ms', ascending=False), hide_index=True, use_container_width=True)
+        if snap['counters']:
+            st.dataframe(pd.DataFrame([{'Counter': k, 'Value': v} for k, v in snap['counters'].items()]),
+                         hide_index=True, use_container_width=True)
+        st.download_button("⬇️ Export JSON", PERF.to_json(), file_name=f"vets4u_perf_{snap['started'].replace(':', '')}.json",
+                           mime="application/json")
+
 if __name__ == "__main__":
     main()
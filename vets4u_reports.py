@@ -0,0 +1,302 @@
+"""Weekly and monthly rota and attendance reports as CSV, HTML and XLSX.
+
+    python vets4u_reports.py --period monthly --from 2025-01-01 --to 2025-12-31 --format csv,html,xlsx --out reports
+
+Each report has three sections per week or month: every day's analyze_day
+result with who was on shift, the absences (booked leave and sick/late
+check-ins), and a per-person lateness summary. Rows are built about a quarter
+at a time and written straight out, so memory stays flat over long ranges.
+XLSX is written directly as SpreadsheetML, without an Excel library.
+With branches configured every branch is exported, into one folder each.
+"""
+import argparse
+import csv
+import html
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import zipfile
+from collections import Counter
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+
+import vets4u_core as core
+from vets4u_branches import Branch, load_branches
+
+PERIODS = ["weekly", "monthly"]
+SECTIONS = {
+    "Days": ["Period", "Date", "Day", "Status", "Staff", "Openers", "Checkers", "Vet Screen", "On Shift", "Late", "Off", "Alerts"],
+    "Absences": ["Period", "Name", "From", "To", "Type", "Source"],
+    "Lateness": ["Period", "Name", "Days", "Present", "Late", "Sick", "Absent", "Lateness %"],
+}
+# Days analyzed per analyze_range call; rows are still written out a period at a time
+BLOCK_DAYS = 92
+
+def periods(start_date, end_date, period="weekly"):
+    """(label, first day, last day) for each Monday-Sunday week or calendar month
+    overlapping [start_date, end_date], clipped to the range."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period}")
+    first = start_date
+    while first <= end_date:
+        if period == "weekly":
+            last = first + timedelta(days=6 - first.weekday())
+            year, week, _ = first.isocalendar()
+            label = f"{year}-W{week:02d}"
+        else:
+            last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+            label = first.strftime("%Y-%m")
+        last = min(last, end_date)
+        yield label, first, last
+        first = last + timedelta(days=1)
+
+def _period_sections(app, label, cols, resolved, lo, hi, first, last):
+    """{section: rows} for the days lo..hi-1 of an analyzed block, rows in SECTIONS column order."""
+    day_rows, reported, lateness = [], [], {}
+    for i in range(lo, hi):
+        checkins, day, _ = resolved[i]
+        key = cols['Date'][i]
+        is_open = cols['status'][i] == 'OPEN'
+        _, active, late, off = day if day is not None else (None, [], [], [])
+        day_rows.append([label, key, cols['Day'][i], cols['overall_status'][i] if is_open else "CLOSED", int(cols['count'][i]),
+                         int(cols['openers'][i]), int(cols['checkers'][i]), bool(cols['vet_screen'][i]), ", ".join(active),
+                         ", ".join(l['Name'] for l in late), ", ".join(f"{s['Name']} ({s['Reason']})" for s in off),
+                         " | ".join(cols['alerts'][i]) if is_open else cols['msg'][i]])
+        for name, status in checkins.items():
+            lateness.setdefault(name, Counter())[status] += 1
+            if status != 'Present': reported.append([label, name, key, key, status, "Check-in"])
+
+    booked = [[label, name, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), typ, "Booked"]
+              for name, typ, start, end in app.absence_index.absent_between(first, last)]
+    summary = []
+    for name, counts in sorted(lateness.items()):
+        attended = counts['Present'] + counts['Late']
+        summary.append([label, name, sum(counts.values()), counts['Present'], counts['Late'], counts['Sick'], counts['Absent'],
+                        round(100 * counts['Late'] / attended, 1) if attended else None])
+    return {"Days": day_rows, "Absences": booked + reported, "Lateness": summary}
+
+def report_sections(app, start_date, end_date, period="weekly"):
+    """Yields (label, {section: rows}) for each period in [start_date, end_date].
+
+    Days are resolved BLOCK_DAYS at a time (one resolve_range per block, shared
+    with analyze_range) and handed out a period at a time, so memory is bounded
+    by the block, not the range.
+    """
+    pending = list(periods(start_date, end_date, period))
+    while pending:
+        block = [pending.pop(0)]
+        while pending and (pending[0][2] - block[0][1]).days < BLOCK_DAYS:
+            block.append(pending.pop(0))
+        first, last = block[0][1], block[-1][2]
+        resolved = app.resolve_range([first + timedelta(days=i) for i in range((last - first).days + 1)])
+        cols = app.analyze_range(first, last, resolved).to_dict('list')
+        for label, p_first, p_last in block:
+            lo, hi = (p_first - first).days, (p_last - first).days + 1
+            yield label, _period_sections(app, label, cols, resolved, lo, hi, p_first, p_last)
+
+def _text(value):
+    return "" if value is None else str(value)
+
+class CsvReport:
+    """One CSV per section, each with a Period column."""
+
+    def __init__(self, folder, stem, title):
+        self.paths = {s: os.path.join(folder, f"{stem}-{s.lower()}.csv") for s in SECTIONS}
+        self.files = {s: open(p, "w", newline="", encoding="utf-8") for s, p in self.paths.items()}
+        self.writers = {s: csv.writer(f) for s, f in self.files.items()}
+        for s, writer in self.writers.items():
+            writer.writerow(SECTIONS[s])
+
+    def add(self, label, sections):
+        for s, rows in sections.items():
+            self.writers[s].writerows(rows)
+
+    def close(self):
+        for f in self.files.values(): f.close()
+        return list(self.paths.values())
+
+class HtmlReport:
+    """One self-contained HTML page with a heading and the three tables per period."""
+
+    STYLE = ("body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1.5em}"
+             "th,td{border:1px solid #ccc;padding:3px 8px;font-size:13px;text-align:left}th{background:#eee}"
+             ".RED{background:#f8d0d0}.AMBER{background:#fbe6c2}.GREEN{background:#d7f0d7}.CLOSED{color:#888}")
+
+    def __init__(self, folder, stem, title):
+        self.path = os.path.join(folder, f"{stem}.html")
+        self.f = open(self.path, "w", encoding="utf-8")
+        self.f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+                     f"<style>{self.STYLE}</style></head><body><h1>{html.escape(title)}</h1>\n")
+
+    def add(self, label, sections):
+        out = [f"<h2>{html.escape(label)}</h2>\n"]
+        for s, rows in sections.items():
+            out.append(f"<h3>{s}</h3><table><tr>{''.join(f'<th>{c}</th>' for c in SECTIONS[s][1:])}</tr>\n")
+            for row in rows:
+                css = f" class='{row[3]}'" if s == "Days" else ""
+                out.append(f"<tr{css}>{''.join(f'<td>{html.escape(_text(v))}</td>' for v in row[1:])}</tr>\n")
+            out.append("</table>\n")
+        self.f.write("".join(out))
+
+    def close(self):
+        self.f.write("</body></html>\n")
+        self.f.close()
+        return [self.path]
+
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+def _xlsx_cell(value):
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+class XlsxReport:
+    """A workbook with one sheet per section, without any Excel library.
+
+    Rows go to a temporary file per sheet as SpreadsheetML with inline strings;
+    close() streams them into the .xlsx zip, so memory stays flat however long
+    the range is.
+    """
+
+    def __init__(self, folder, stem, title):
+        self.path = os.path.join(folder, f"{stem}.xlsx")
+        self.sheets = {s: tempfile.TemporaryFile() for s in SECTIONS}
+        for s in SECTIONS:
+            self._rows(s, [SECTIONS[s]])
+
+    def _rows(self, section, rows):
+        self.sheets[section].write("".join(f"<row>{''.join(_xlsx_cell(v) for v in row)}</row>" for row in rows).encode("utf-8"))
+
+    def add(self, label, sections):
+        for s, rows in sections.items():
+            self._rows(s, rows)
+
+    def close(self):
+        names = list(SECTIONS)
+        with zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("[Content_Types].xml",
+                       '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                       '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                       '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                       '<Default Extension="xml" ContentType="application/xml"/>'
+                       '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                       + "".join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+                                 'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                                 for i in range(1, len(names) + 1)) + '</Types>')
+            z.writestr("_rels/.rels", f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{_PKG_REL_NS}">'
+                       f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>')
+            z.writestr("xl/workbook.xml", f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><workbook xmlns="{_MAIN_NS}" '
+                       f'xmlns:r="{_REL_NS}"><sheets>'
+                       + "".join(f'<sheet name="{s}" sheetId="{i}" r:id="rId{i}"/>' for i, s in enumerate(names, 1))
+                       + '</sheets></workbook>')
+            z.writestr("xl/_rels/workbook.xml.rels", f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{_PKG_REL_NS}">'
+                       + "".join(f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                                 for i in range(1, len(names) + 1)) + '</Relationships>')
+            for i, s in enumerate(names, 1):
+                with z.open(f"xl/worksheets/sheet{i}.xml", "w") as out:
+                    out.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><worksheet xmlns="{_MAIN_NS}"><sheetData>'.encode("utf-8"))
+                    self.sheets[s].seek(0)
+                    shutil.copyfileobj(self.sheets[s], out)
+                    out.write(b"</sheetData></worksheet>")
+                self.sheets[s].close()
+        return [self.path]
+
+FORMATS = {"csv": CsvReport, "html": HtmlReport, "xlsx": XlsxReport}
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower() or "branch"
+
+def export_branch(branch, start_date, end_date, period, formats, out_dir):
+    """Writes one branch's reports into out_dir/<branch>/. Returns the files written."""
+    app = branch.open()
+    if app.load_error is not None:
+        raise app.load_error
+    folder = os.path.join(out_dir, _slug(branch.name))
+    os.makedirs(folder, exist_ok=True)
+    stem = f"{period}-{start_date:%Y%m%d}-{end_date:%Y%m%d}"
+    title = f"{branch.name} {period} report, {start_date:%d %b %Y} to {end_date:%d %b %Y}"
+    reports = [FORMATS[f](folder, stem, title) for f in formats]
+    try:
+        for label, sections in report_sections(app, start_date, end_date, period):
+            for report in reports: report.add(label, sections)
+    finally:
+        written = [path for report in reports for path in report.close()]
+    return written
+
+def export_reports(branches, start_date, end_date, period="weekly", formats=("csv",), out_dir="reports"):
+    """Exports every branch in turn. Returns ({branch name: files}, {branch name: error})."""
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown)}")
+    written, errors = {}, {}
+    for branch in branches:
+        try:
+            written[branch.name] = export_branch(branch, start_date, end_date, period, formats, out_dir)
+        except Exception as e:
+            errors[branch.name] = e
+    core.PERF.count('report branches exported', len(written))
+    return written, errors
+
+def export_zip(branches, start_date, end_date, period="weekly", formats=("csv",)):
+    """export_reports into a temporary folder, returned as zip bytes (for a download button)."""
+    with tempfile.TemporaryDirectory() as out_dir:
+        written, errors = export_reports(branches, start_date, end_date, period, formats, out_dir)
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+            for paths in written.values():
+                for path in paths:
+                    z.write(path, os.path.relpath(path, out_dir))
+    return buffer.getvalue(), errors
+
+def local_branch(data_dir=None):
+    """The data folder the dashboard is running on, as a Branch."""
+    return Branch(os.path.basename(os.path.abspath(data_dir or ".")) or "vets4u", data_dir)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--period", choices=PERIODS, default="weekly")
+    parser.add_argument("--from", dest="start", required=True, help="First day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", required=True, help="Last day, YYYY-MM-DD")
+    parser.add_argument("--format", default="csv", help=f"Comma-separated, from {', '.join(FORMATS)}")
+    parser.add_argument("--out", default="reports", help="Output folder (default: reports)")
+    parser.add_argument("--branch", action="append", help="Only this branch (repeatable; default: all configured branches)")
+    parser.add_argument("--data-dir", help="Folder holding the tracker CSVs when no branches are configured")
+    args = parser.parse_args(argv)
+
+    try:
+        start = datetime.strptime(args.start, "%Y-%m-%d")
+        end = datetime.strptime(args.end, "%Y-%m-%d")
+    except ValueError:
+        parser.error("dates must be YYYY-MM-DD")
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown or not formats:
+        parser.error(f"--format must be from {', '.join(FORMATS)}")
+    branches = load_branches() or [local_branch(args.data_dir)]
+    if args.branch:
+        branches = [b for b in branches if b.name in args.branch]
+        if not branches:
+            raise SystemExit(f"No such branch: {', '.join(args.branch)}")
+
+    started = datetime.now()
+    written, errors = export_reports(branches, start, end, args.period, formats, args.out)
+    for name, paths in written.items():
+        print(f"{name}: {len(paths)} file(s)")
+    for name, error in errors.items():
+        print(f"{name}: FAILED ({error})")
+    print(f"Wrote {sum(len(p) for p in written.values())} file(s) to {args.out} in {(datetime.now() - started).total_seconds():.2f}s")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
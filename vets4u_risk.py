@@ -0,0 +1,113 @@
+"""Monte Carlo staffing risk over the forecast horizon.
+
+    risk = simulate_risk(app, start, n_days=90, scenarios=10000)
+
+analyze_day says whether the planned roster meets the rules. This estimates how
+often each alert fires once people call in sick or turn up late: every scenario
+draws, for each rostered person on each day, whether they are off sick or late
+from their own rates in the check-in log, then counts the staff, openers and
+checkers who are left. People are treated as independent of each other and of
+other days.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+import vets4u_core as core
+from vets4u_analytics import attendance_rollups
+
+RISK_COLUMNS = ["Date", "Day", "Status", "Planned", "Expected Staff", "P(RED)", "P(No Opener)",
+                "P(<2 Checkers)", "P(Staff < 2)", "P(No Backup)"]
+# Pseudo-days of team-average attendance added to everyone's history, so people with
+# only a few check-ins get rates near the team's rather than 0% or 100%
+PRIOR_DAYS = 20
+# Scenarios simulated per block, to keep the random draws to a few tens of MB
+BLOCK = 2000
+
+def absence_rates(storage):
+    """{normalized name: (sick rate, late rate)} per working day from the check-in log,
+    plus the team-wide rates under the key None. Sick counts Sick and Absent check-ins;
+    Holiday check-ins are left out, as booked leave is already off the roster."""
+    people = attendance_rollups(storage).by_person()
+    sick = people['Sick'] + people['Absent']
+    late = people['Late']
+    worked = people['Present'] + late + sick
+    total = worked.sum()
+    team = (float(sick.sum() / total), float(late.sum() / total)) if total else (0.0, 0.0)
+    rates = {None: team}
+    for name, s, l, w in zip(people.index, sick, late, worked):
+        rates[core.normalize_name(name)] = ((s + PRIOR_DAYS * team[0]) / (w + PRIOR_DAYS),
+                                            (l + PRIOR_DAYS * team[1]) / (w + PRIOR_DAYS))
+    return rates
+
+def simulate_risk(app, start_date, n_days=90, scenarios=10000, seed=None, rates=None):
+    """Probability of each analyze_day alert for n_days from start_date.
+
+    Starts from each day's roster as analyze_day resolves it (booked leave and
+    check-ins already applied); anyone who has already checked in that day is
+    taken as they reported. Closed days get probability 0. Returns a DataFrame
+    with RISK_COLUMNS.
+    """
+    rates = rates if rates is not None else absence_rates(app.storage)
+    team = rates[None]
+    days = [start_date + timedelta(days=i) for i in range(n_days)]
+    status, planned = [], []
+    slot_day, slot_away, slot_open, slot_check = [], [], [], []
+    for i, (checkins, resolved, _) in enumerate(app.resolve_range(days)):
+        status.append('CLOSED' if resolved is None else 'OPEN')
+        active = [] if resolved is None else resolved[1]
+        planned.append(len(active))
+        for name in active:
+            sick, late = (0.0, 0.0) if name in checkins else rates.get(core.normalize_name(name), team)
+            caps = app.skills_index.get(name)
+            slot_day.append(i)
+            slot_away.append(sick + late)
+            slot_open.append(bool(caps & core.SKILL_OPENING))
+            slot_check.append(bool(caps & core.SKILL_SECOND_CHECK))
+
+    # Slots are grouped by day, so per-day totals are reduceat sums over each day's columns
+    slot_day = np.asarray(slot_day, dtype='int64')
+    away_p = np.asarray(slot_away, dtype='float32')
+    can_open = np.asarray(slot_open, dtype=bool)
+    can_check = np.asarray(slot_check, dtype=bool)
+    staffed = np.unique(slot_day)
+    starts = np.searchsorted(slot_day, staffed)
+
+    hits = {k: np.zeros(n_days) for k in ('red', 'opener', 'checkers', 'short', 'backup')}
+    staff_sum = np.zeros(n_days)
+    rng = np.random.default_rng(seed)
+    done = 0
+    while done < scenarios:
+        block = min(BLOCK, scenarios - done)
+        present = rng.random((block, len(slot_day)), dtype='float32') >= away_p
+        count = np.zeros((block, n_days), dtype='int64')
+        openers = np.zeros((block, n_days), dtype='int64')
+        checkers = np.zeros((block, n_days), dtype='int64')
+        if len(staffed):
+            count[:, staffed] = np.add.reduceat(present, starts, axis=1, dtype='int64')
+            openers[:, staffed] = np.add.reduceat(present & can_open, starts, axis=1, dtype='int64')
+            checkers[:, staffed] = np.add.reduceat(present & can_check, starts, axis=1, dtype='int64')
+        short, no_opener, few_checkers = count < 2, openers < 1, checkers < 2
+        hits['short'] += short.sum(axis=0)
+        hits['opener'] += no_opener.sum(axis=0)
+        hits['checkers'] += few_checkers.sum(axis=0)
+        hits['red'] += (short | no_opener | few_checkers).sum(axis=0)
+        hits['backup'] += (count == 2).sum(axis=0)
+        staff_sum += count.sum(axis=0)
+        done += block
+    core.PERF.count('risk scenarios', done * n_days)
+
+    is_open = np.asarray(status) == 'OPEN'
+    p = {k: np.where(is_open, v / max(done, 1), 0.0).round(4) for k, v in hits.items()}
+    return core.pd.DataFrame({
+        "Date": [d.strftime("%Y-%m-%d") for d in days],
+        "Day": [d.strftime("%a") for d in days],
+        "Status": status,
+        "Planned": planned,
+        "Expected Staff": np.where(is_open, staff_sum / max(done, 1), 0.0).round(2),
+        "P(RED)": p['red'],
+        "P(No Opener)": p['opener'],
+        "P(<2 Checkers)": p['checkers'],
+        "P(Staff < 2)": p['short'],
+        "P(No Backup)": p['backup'],
+    }, columns=RISK_COLUMNS)
@@ -0,0 +1,165 @@
+"""Automatic rota generation for the Schedule Builder.
+
+    rota = generate_rota(app, start, end, staff_per_day=4)
+    save_rota(app, rota)
+
+Fills Opener, Downstairs, Upstairs and Vet Screening for each weekday from the
+Skills Matrix, leaving out anyone on approved leave. Every day it can staff
+meets the analyze_day rules (2+ staff, an opener, 2+ second checkers). Shifts
+are spread in proportion to how many days each person is available.
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+import vets4u_core as core
+
+ROTA_COLUMNS = core.SCHEDULE_COLUMNS + ["Staff", "Status", "Issues"]
+
+class _Day:
+    def __init__(self, date_obj, available):
+        self.date = date_obj
+        self.available = available
+        self.crew = []
+        self.opener = None
+        self.vet = None
+
+def _counts(crew, caps):
+    openers = sum(1 for n in crew if caps[n] & core.SKILL_OPENING)
+    checkers = sum(1 for n in crew if caps[n] & core.SKILL_SECOND_CHECK)
+    return openers, checkers
+
+def _meets_rules(crew, caps):
+    openers, checkers = _counts(crew, caps)
+    return len(crew) >= 2 and openers >= 1 and checkers >= 2
+
+def _assign_roles(day, caps, vet_load=None):
+    """Picks the opener and vet screener from the day's crew."""
+    def pick(skill, current):
+        if current in day.crew and caps[current] & skill:
+            return current
+        options = [n for n in day.crew if caps[n] & skill]
+        if not options: return None
+        return min(options, key=lambda n: vet_load.get(n, 0)) if vet_load is not None else options[0]
+    day.opener = pick(core.SKILL_OPENING, day.opener)
+    day.vet = pick(core.SKILL_VET_SCREENING, day.vet)
+
+def _fill_day(day, staff_per_day, caps, ratio, vet_load):
+    """Greedy crew for one day: least-loaded opener, then checkers, then anyone."""
+    pool = sorted(day.available, key=ratio)
+    crew = []
+
+    def take(skill, needed):
+        for n in pool:
+            if needed <= 0: break
+            if n not in crew and (skill is None or caps[n] & skill):
+                crew.append(n)
+                needed -= 1
+
+    take(core.SKILL_OPENING, 1)
+    take(core.SKILL_SECOND_CHECK, 2 - _counts(crew, caps)[1])
+    if not any(caps[n] & core.SKILL_VET_SCREENING for n in crew):
+        take(core.SKILL_VET_SCREENING, 1 if len(crew) < staff_per_day else 0)
+    take(None, staff_per_day - len(crew))
+    day.crew = crew
+    _assign_roles(day, caps, vet_load)
+
+def _rebalance(days, caps, shifts, avail, deadline):
+    """Moves shifts from the most to the least loaded people until loads are within
+    one shift of their fair share, no legal swap is left, or time runs out."""
+    total = sum(shifts.values())
+    total_avail = sum(avail.values()) or 1
+    target = {n: total * avail[n] / total_avail for n in avail}
+    rng = random.Random(0)
+    while avail and time.perf_counter() < deadline:
+        by_excess = sorted(avail, key=lambda n: shifts[n] - target[n])
+        if shifts[by_excess[-1]] - target[by_excess[-1]] - (shifts[by_excess[0]] - target[by_excess[0]]) <= 1:
+            return
+        moved = False
+        for over in reversed(by_excess[len(by_excess) // 2:]):
+            for under in by_excess[:len(by_excess) // 2]:
+                if shifts[over] - target[over] - (shifts[under] - target[under]) <= 1:
+                    break
+                candidates = [d for d in days if over in d.crew and under in d.available and under not in d.crew]
+                rng.shuffle(candidates)
+                for day in candidates:
+                    crew = [under if n == over else n for n in day.crew]
+                    if not _meets_rules(crew, caps): continue
+                    had_vet = day.vet is not None
+                    before = (day.crew, day.opener, day.vet)
+                    day.crew = crew
+                    _assign_roles(day, caps)
+                    if had_vet and day.vet is None:
+                        day.crew, day.opener, day.vet = before
+                        continue
+                    shifts[over] -= 1
+                    shifts[under] += 1
+                    moved = True
+                    break
+                if moved: break
+            if moved: break
+        if not moved:
+            return
+
+def generate_rota(app, start_date, end_date, staff_per_day=4, time_budget=0.5, overwrite=False):
+    """Proposes a rota for the weekdays in [start_date, end_date].
+
+    Dates that already have a simple schedule row are skipped unless overwrite
+    is set. Returns a DataFrame with the schedule columns plus Staff, the
+    predicted Status and any Issues (e.g. not enough openers available).
+    """
+    deadline = time.perf_counter() + time_budget
+    skills = app.data.get('skills')
+    names = []
+    for n in ([] if skills is None else skills.index):
+        if isinstance(n, str) and n.strip() and n not in names: names.append(n)
+    caps = {n: app.skills_index.get(n) for n in names}
+
+    days = []
+    n_days = max((end_date - start_date).days + 1, 0)
+    for d in (start_date + timedelta(days=i) for i in range(n_days)):
+        if d.weekday() > 4: continue
+        if not overwrite and app.schedule.get(d.strftime("%Y-%m-%d")) is not None: continue
+        away = {core.normalize_name(n) for n in app.absence_index.absent_on(d)}
+        days.append(_Day(d, [n for n in names if core.normalize_name(n) not in away]))
+
+    avail = {n: sum(1 for day in days if n in day.available) for n in names}
+    shifts = dict.fromkeys(names, 0)
+    openings = dict.fromkeys(names, 0)
+    vet_load = dict.fromkeys(names, 0)
+    ratio = lambda n: (shifts[n] / avail[n] if avail[n] else float('inf'), openings[n], n)
+    for day in days:
+        _fill_day(day, staff_per_day, caps, ratio, vet_load)
+        for n in day.crew: shifts[n] += 1
+        if day.opener: openings[day.opener] += 1
+        if day.vet: vet_load[day.vet] += 1
+
+    _rebalance(days, caps, shifts, {n: a for n, a in avail.items() if a}, deadline)
+
+    rows = []
+    for day in days:
+        rest = [n for n in day.crew if n != day.opener]
+        half = (len(rest) + 1) // 2
+        openers, checkers = _counts(day.crew, caps)
+        alerts, status = core.staffing_alerts(len(day.crew), openers, checkers)
+        issues = list(alerts)
+        if day.vet is None: issues.append("No vet screener available.")
+        rows.append({
+            "Date": day.date.strftime("%Y-%m-%d"),
+            "Opener": day.opener or "",
+            "Downstairs": ", ".join(rest[:half]),
+            "Upstairs": ", ".join(rest[half:]),
+            "Vet Screening": day.vet or "",
+            "Staff": len(day.crew),
+            "Status": status,
+            "Issues": " | ".join(issues),
+        })
+    return core.pd.DataFrame(rows, columns=ROTA_COLUMNS)
+
+def save_rota(app, rota):
+    """Writes a generate_rota result through the schedule store, one row per date."""
+    split = lambda cell: [n.strip() for n in str(cell).split(",") if n.strip()]
+    for row in rota.to_dict('records'):
+        app.save_simple_schedule(datetime.strptime(row["Date"], "%Y-%m-%d"), split(row["Opener"]), split(row["Downstairs"]),
+                                 split(row["Upstairs"]), split(row["Vet Screening"]))
+    return len(rota)